@@ -0,0 +1,273 @@
+import argparse  # library untuk membaca argumen command line
+import time  # library untuk mengukur waktu
+
+import cv2  # library untuk manipulasi gambar dan video (kamera)
+import mediapipe as mp  # library untuk mendeteksi tangan
+import numpy as np  # library untuk operasi matematika dan array
+
+from main import (MAX_FAILS, MAX_PLAYERS, collect_hands, create_hands_detector, detect_gesture,
+                  detect_gestures_batch, draw_detection_zone, draw_hand_overlay, draw_hud_panel,
+                  landmarks_to_array, render_game_info, track_hands)
+from pipeline import read_frame, read_hands, start_pipeline, stop_pipeline, CTRL_INFERENCE_COUNT
+from gestures import (DEFAULT_REJECT_DISTANCE, add_gesture_templates, build_gesture_index, canonical_pose,
+                      jitter_pose, query_gesture_index, to_frame_coordinates)
+
+# =========================
+# FUNGSI BANTU BENCHMARK
+# =========================
+
+# Baca frame dari file video (atau index kamera) ke memori supaya semua jalur diuji dengan frame yang sama
+def load_frames(source, max_frames, width=1280, height=720):
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not cap.isOpened():
+        raise IOError(f"Tidak dapat membuka sumber video: {source}")
+
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height)))
+    cap.release()
+    return frames
+
+# Ringkas daftar waktu (ms) menjadi rata-rata dan persentil
+def summarize_times(times_ms):
+    if not times_ms:
+        return {'frames': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    arr = np.asarray(times_ms, dtype=np.float64)
+    return {
+        'frames': int(arr.size),
+        'mean_ms': float(arr.mean()),
+        'p50_ms': float(np.percentile(arr, 50)),
+        'p95_ms': float(np.percentile(arr, 95)),
+        'max_ms': float(arr.max())
+    }
+
+def print_summary(name, summary):
+    print(f"{name:<28} frames={summary['frames']:<5} mean={summary['mean_ms']:7.2f} ms  "
+          f"p50={summary['p50_ms']:7.2f} ms  p95={summary['p95_ms']:7.2f} ms  max={summary['max_ms']:7.2f} ms")
+
+# =========================
+# BENCHMARK SATU TANGAN VS DUA TANGAN
+# =========================
+
+# Jalankan jalur deteksi (flip -> MediaPipe -> klasifikasi gesture -> pelacakan) untuk semua frame
+def run_hand_path(frames, num_players):
+    width, height = frames[0].shape[1], frames[0].shape[0]
+    lane_w = width // num_players
+    detector = create_hands_detector(num_players)
+    hand_tracks = {}
+
+    frame_times = []
+    classify_times = []
+    hands_seen = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        rgb_frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        hand_results = detector.process(rgb_frame)
+        t1 = time.perf_counter()
+        hands = collect_hands(hand_results, width, height)
+        if num_players > 1:
+            track_hands(hand_tracks, hands, num_players, lane_w)
+        t2 = time.perf_counter()
+
+        frame_times.append((t2 - t0) * 1000)
+        classify_times.append((t2 - t1) * 1000)
+        hands_seen.append(len(hands))
+
+    detector.close()
+    return frame_times, classify_times, hands_seen
+
+# Bandingkan klasifikasi per tangan (loop detect_gesture) dengan klasifikasi batch untuk landmark yang sama
+def compare_classification(frames, repeats=200):
+    detector = create_hands_detector(MAX_PLAYERS)
+    landmark_lists = []
+    for frame in frames:
+        hand_results = detector.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+        if hand_results.multi_hand_landmarks and len(hand_results.multi_hand_landmarks) >= 2:
+            landmark_lists = [h.landmark for h in hand_results.multi_hand_landmarks]
+            break
+    detector.close()
+
+    if not landmark_lists:
+        return None
+
+    loop_times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        [detect_gesture(landmarks) for landmarks in landmark_lists]
+        loop_times.append((time.perf_counter() - t0) * 1000)
+
+    batch_times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        detect_gestures_batch(landmarks_to_array(landmark_lists))
+        batch_times.append((time.perf_counter() - t0) * 1000)
+
+    return loop_times, batch_times
+
+def benchmark_hand_paths(source, max_frames=300):
+    frames = load_frames(source, max_frames)
+    if not frames:
+        print("Tidak ada frame yang bisa dibaca.")
+        return
+
+    print(f"Sumber: {source} ({len(frames)} frame)")
+    for num_players in (1, MAX_PLAYERS):
+        frame_times, classify_times, hands_seen = run_hand_path(frames, num_players)
+        print_summary(f"{num_players} tangan - frame", summarize_times(frame_times))
+        print_summary(f"{num_players} tangan - gesture+track", summarize_times(classify_times))
+        print(f"{'':<28} rata-rata tangan terdeteksi: {np.mean(hands_seen):.2f}")
+
+    comparison = compare_classification(frames)
+    if comparison:
+        loop_times, batch_times = comparison
+        print_summary("2 tangan - loop detect_gesture", summarize_times(loop_times))
+        print_summary("2 tangan - batch", summarize_times(batch_times))
+
+# =========================
+# BENCHMARK SATU PROSES VS MULTI PROSES
+# =========================
+
+# Pekerjaan render yang sama untuk kedua jalur: landmark, zona deteksi, panel, dan info game
+def render_frame(img, hands, width, height, mp_drawing, mp_drawing_styles):
+    for hand in hands:
+        draw_hand_overlay(img, hand, "WRIST", (255, 0, 255), mp_drawing, mp_drawing_styles)
+    draw_detection_zone(img, width, height)
+    draw_hud_panel(img, width, height)
+    render_game_info(img, width, height, 0, 0, MAX_FAILS, bool(hands), hands[0]['gesture'] if hands else "Unknown",
+                     7, 4, False, [], -1, '', None)
+
+def run_single_process(source, max_frames, width, height, show):
+    mp_drawing = mp.solutions.drawing_utils
+    mp_drawing_styles = mp.solutions.drawing_styles
+    cap = cv2.VideoCapture(source)
+    detector = create_hands_detector(1)
+
+    frame_times = []
+    start = time.perf_counter()
+    while len(frame_times) < max_frames:
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        if frame.shape[0] != height or frame.shape[1] != width:
+            frame = cv2.resize(frame, (width, height))
+        hand_results = detector.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        hands = collect_hands(hand_results, width, height)
+        img = frame.copy()
+        render_frame(img, hands, width, height, mp_drawing, mp_drawing_styles)
+        if show:
+            cv2.imshow("benchmark", img)
+            cv2.waitKey(1)
+        frame_times.append((time.perf_counter() - t0) * 1000)
+    wall_s = time.perf_counter() - start
+
+    detector.close()
+    cap.release()
+    return {'frame_times': frame_times, 'wall_s': wall_s, 'inferences': len(frame_times), 'result_age': [0]}
+
+def run_multi_process(source, max_frames, width, height, show):
+    mp_drawing = mp.solutions.drawing_utils
+    mp_drawing_styles = mp.solutions.drawing_styles
+    # backpressure: capture menunggu render supaya semua frame klip ikut dirender seperti jalur satu proses
+    pipeline = start_pipeline(source, width, height, 1, backpressure=True)
+    if pipeline is None:
+        raise IOError(f"Tidak dapat membuka sumber video: {source}")
+
+    frame_times = []
+    result_age = []  # selisih nomor frame yang dirender dengan frame asal landmark
+    start = time.perf_counter()
+    while len(frame_times) < max_frames:
+        t0 = time.perf_counter()
+        frame = read_frame(pipeline)
+        if frame is None:
+            break
+        hands = read_hands(pipeline, width, height)
+        if hands is None:
+            break
+        img = frame.copy()
+        render_frame(img, hands, width, height, mp_drawing, mp_drawing_styles)
+        if show:
+            cv2.imshow("benchmark", img)
+            cv2.waitKey(1)
+        frame_times.append((time.perf_counter() - t0) * 1000)
+        result_age.append(pipeline['last_seq'] - pipeline['result_seq'])
+    wall_s = time.perf_counter() - start
+
+    inferences = int(pipeline['views']['control'][CTRL_INFERENCE_COUNT])
+    stop_pipeline(pipeline)
+    return {'frame_times': frame_times, 'wall_s': wall_s, 'inferences': inferences, 'result_age': result_age}
+
+def benchmark_pipeline(source, max_frames=300, width=1280, height=720, show=False):
+    source = int(source) if str(source).isdigit() else source
+    print(f"Sumber: {source}")
+    for name, runner in (("satu proses", run_single_process), ("multi proses", run_multi_process)):
+        result = runner(source, max_frames, width, height, show)
+        frames = len(result['frame_times'])
+        print_summary(f"{name} - render loop", summarize_times(result['frame_times']))
+        print(f"{'':<28} {frames / result['wall_s']:.1f} FPS, inferensi {result['inferences']} kali, "
+              f"umur landmark rata-rata {np.mean(result['result_age']):.2f} frame")
+
+# =========================
+# BENCHMARK INDEKS TEMPLATE GESTURE
+# =========================
+
+# Registry buatan dengan banyak gesture: pose dasar acak (kombinasi jari + geseran tiap landmark)
+def synthetic_registry(num_gestures, templates_per_gesture, rng):
+    registry = {'reject_distance': DEFAULT_REJECT_DISTANCE, 'gestures': []}
+    bases = []
+    for i in range(num_gestures):
+        extended = {finger for finger in range(1, 5) if rng.random() < 0.5}
+        base = canonical_pose(extended, rng.random() < 0.5)
+        base[1:, :2] += rng.normal(0.0, 0.02, size=(20, 2))
+        bases.append(base)
+        templates = [to_frame_coordinates(jitter_pose(base, rng)) for _ in range(templates_per_gesture)]
+        add_gesture_templates(registry, f"Gesture {i}", templates, source="sintetis")
+    return registry, bases
+
+def benchmark_gesture_index(num_gestures=60, templates_per_gesture=100, repeats=500):
+    rng = np.random.default_rng(0)
+    registry, bases = synthetic_registry(num_gestures, templates_per_gesture, rng)
+    labels = rng.integers(0, num_gestures, size=1000)
+    queries = np.array([to_frame_coordinates(jitter_pose(bases[i], rng)) for i in labels])
+    print(f"{num_gestures} gesture, {num_gestures * templates_per_gesture} template")
+
+    for method in ("brute", "kdtree"):
+        start = time.perf_counter()
+        index = build_gesture_index(registry, method)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        names, _ = query_gesture_index(index, queries)
+        accuracy = np.mean([name == f"Gesture {i}" for name, i in zip(names, labels)])
+
+        for num_hands in (1, MAX_PLAYERS):
+            times = []
+            for r in range(repeats):
+                batch = queries[r % (len(queries) - num_hands):][:num_hands]
+                t0 = time.perf_counter()
+                query_gesture_index(index, batch)
+                times.append((time.perf_counter() - t0) * 1000)
+            print_summary(f"{index['method']} - {num_hands} tangan", summarize_times(times))
+        print(f"{'':<28} bangun indeks {build_ms:.1f} ms, akurasi {accuracy:.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark jalur deteksi dan pipeline game")
+    parser.add_argument("source", nargs="?", help="file video rekaman atau index kamera")
+    parser.add_argument("--frames", type=int, default=300, help="jumlah frame maksimal")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="bandingkan loop satu proses dengan pipeline multi proses (pipeline.py)")
+    parser.add_argument("--show", action="store_true", help="tampilkan frame saat benchmark pipeline")
+    parser.add_argument("--gesture-index", action="store_true",
+                        help="ukur waktu lookup indeks template gesture (tanpa video)")
+    args = parser.parse_args()
+    if args.gesture_index:
+        benchmark_gesture_index()
+    elif args.source is None:
+        parser.error("source wajib diisi kecuali memakai --gesture-index")
+    elif args.pipeline:
+        benchmark_pipeline(args.source, args.frames, show=args.show)
+    else:
+        benchmark_hand_paths(args.source, args.frames)
@@ -0,0 +1,274 @@
+import argparse  # library untuk membaca argumen command line
+import glob  # library untuk mencari file rekaman
+import json  # library untuk menulis profil threshold
+import os  # library untuk operasi file dan folder
+import time  # library untuk waktu dan delay
+
+import cv2  # library untuk manipulasi gambar dan video (kamera)
+import numpy as np  # library untuk operasi matematika dan array
+
+from main import (GESTURE_LABELS, GESTURE_THRESHOLDS, GESTURE_UNKNOWN, PROFILE_DIR, classify_gesture_features,
+                  create_hands_detector, draw_text_with_outline, gesture_conditions, gesture_features,
+                  gesture_rules, landmarks_to_array)
+
+# =========================
+# REKAMAN LANDMARK BERLABEL
+# =========================
+
+# Rekaman disimpan sebagai file .npz berisi:
+#   points : float32 (jumlah_frame, 21, 3) -> landmark MediaPipe ternormalisasi
+#   labels : str (jumlah_frame,)           -> gesture yang sedang diperagakan, salah satu GESTURE_LABELS
+# new_gesture=True mengizinkan nama gesture baru (untuk template di gestures.py, bukan untuk sweep).
+def record_landmarks(output_path, gesture, frames=300, countdown=3.0, new_gesture=False):
+    if gesture not in GESTURE_LABELS and not new_gesture:
+        raise ValueError(f"Gesture tidak dikenal: {gesture}. Pilihan: {GESTURE_LABELS}")
+
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("Tidak dapat membuka kamera.")
+        return
+    detector = create_hands_detector(1)
+
+    recorded = []
+    aspect_ratio = None  # lebar / tinggi frame, disimpan untuk registry template gestures.py
+    start_time = time.time()
+    while len(recorded) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        aspect_ratio = frame.shape[1] / frame.shape[0]
+        hand_results = detector.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        remaining = countdown - (time.time() - start_time)
+        if remaining > 0:
+            status = f"Siapkan pose {gesture}: {remaining:.1f}"
+        else:
+            status = f"Merekam {gesture}: {len(recorded)}/{frames}"
+            if hand_results.multi_hand_landmarks:
+                recorded.append(landmarks_to_array([hand_results.multi_hand_landmarks[0].landmark])[0])
+
+        draw_text_with_outline(frame, status, (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        cv2.imshow("Rekam Landmark", frame)
+        if cv2.waitKey(1) == 27:  # ESC untuk berhenti lebih awal
+            break
+
+    detector.close()
+    cap.release()
+    cv2.destroyAllWindows()
+
+    if recorded:
+        np.savez_compressed(output_path, points=np.array(recorded, dtype=np.float32),
+                            labels=np.array([gesture] * len(recorded)), aspect_ratio=aspect_ratio)
+        print(f"{len(recorded)} frame disimpan ke {output_path}")
+
+# Gabungkan semua rekaman (.npz) dari daftar file atau folder
+def load_recordings(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.npz"))))
+        else:
+            files.append(path)
+
+    points, labels = [], []
+    for file in files:
+        with np.load(file) as data:
+            file_points = data['points'].astype(np.float32)
+            file_labels = data['labels'].astype(str)
+        # rekaman gesture baru (record --new-gesture) hanya untuk registry template, dilewati di sweep
+        known = np.isin(file_labels, GESTURE_LABELS)
+        if not known.all():
+            print(f"Melewati {np.count_nonzero(~known)} frame di {file}: label bukan gesture aturan "
+                  f"{sorted(set(file_labels[~known].tolist()))}")
+        if known.any():
+            points.append(file_points[known])
+            labels.append(file_labels[known])
+    if not points:
+        raise ValueError("Tidak ada rekaman landmark yang ditemukan.")
+
+    labels = np.concatenate(labels)
+    label_index = np.array([GESTURE_LABELS.index(label) for label in labels], dtype=np.int8)
+    return np.concatenate(points), label_index
+
+# =========================
+# SWEEP THRESHOLD (VEKTORISASI)
+# =========================
+
+# Nilai yang dicoba untuk tiap threshold; semua kombinasi dievaluasi (13 * 7 * 9 * 7 = 5733 set)
+DEFAULT_GRID = {
+    'finger_margin': np.linspace(0.0, 0.06, 13),
+    'thumb_dist': np.linspace(0.0, 0.03, 7),
+    'thumb_y': np.linspace(0.0, 0.08, 9),
+    'pointing_thumb': np.linspace(0.05, 0.35, 7)
+}
+
+# Semua kombinasi grid sebagai dict {nama_threshold: array (jumlah_set,)}, urutan sumbu = GESTURE_THRESHOLDS
+def threshold_grid(grid):
+    names = list(GESTURE_THRESHOLDS)
+    mesh = np.meshgrid(*[np.asarray(grid[name], dtype=np.float32) for name in names], indexing='ij')
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+# Padatkan mask boolean (..., jumlah_frame) menjadi bitset uint64 (..., jumlah_frame / 64).
+# Bit sisa di akhir selalu 0 sehingga tidak ikut terhitung setelah di-AND dengan mask label.
+def pack_bits(mask):
+    packed = np.packbits(mask, axis=-1)
+    padding = (-packed.shape[-1]) % 8
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), dtype=np.uint8)], axis=-1)
+    return packed.view(np.uint64)
+
+def popcount(words):
+    if hasattr(np, "bitwise_count"):  # numpy 2.0+
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return POPCOUNT_TABLE[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Jumlah frame yang benar per gesture untuk setiap kombinasi threshold, bentuk (jumlah_set, jumlah_label).
+# Kondisi dasar dihitung sekali per nilai threshold (gesture_conditions), dipadatkan jadi bitset, lalu
+# aturan gesture_rules() dievaluasi untuk seluruh grid lewat broadcasting. Hanya sumbu finger_margin
+# yang diulang supaya memori tetap kecil.
+def sweep_thresholds(points, labels, grid):
+    names = list(GESTURE_THRESHOLDS)
+    values = {name: np.asarray(grid[name], dtype=np.float32) for name in names}
+    sizes = [len(values[name]) for name in names]
+
+    # bentuk tiap threshold menempati sumbunya sendiri di grid (sumbu 0 = finger_margin)
+    axis_of = {name: i for i, name in enumerate(names)}
+    thresholds = {name: values[name][:, None] for name in names}
+    raw = gesture_conditions(gesture_features(points), thresholds)
+
+    def to_grid(mask, name):
+        shape = [1] * (len(names) - 1)
+        shape[axis_of[name] - 1] = sizes[axis_of[name]]
+        return pack_bits(mask).reshape(shape + [-1])
+
+    conditions = {
+        'thumb_mcp_open': to_grid(raw['thumb_mcp_open'], 'thumb_dist'),
+        'thumb_ip_open': to_grid(raw['thumb_ip_open'], 'thumb_dist'),
+        'thumb_y_ok': to_grid(raw['thumb_y_ok'], 'thumb_y'),
+        'thumb_near_index': to_grid(raw['thumb_near_index'], 'pointing_thumb'),
+        'index_up': pack_bits(raw['index_up'])
+    }
+    extended = [pack_bits(mask) for mask in raw['extended']]  # (jumlah_margin, kata)
+    bent = [pack_bits(mask) for mask in raw['bent']]
+    label_bits = [pack_bits(labels == i) for i in range(len(GESTURE_LABELS))]
+
+    correct = np.zeros(sizes[:1] + sizes[1:] + [len(GESTURE_LABELS)], dtype=np.int64)
+    for m in range(sizes[0]):
+        conditions['extended'] = [finger[m] for finger in extended]
+        conditions['bent'] = [finger[m] for finger in bent]
+        rules = gesture_rules(conditions)
+
+        # aturan yang lebih awal menang: frame yang sudah cocok tidak dihitung lagi di aturan berikutnya
+        taken = np.zeros_like(rules[0])
+        for index, rule in enumerate(rules):
+            correct[m, ..., index] = popcount(rule & ~taken & label_bits[index])
+            taken = taken | rule
+        correct[m, ..., GESTURE_UNKNOWN] = popcount(~taken & label_bits[GESTURE_UNKNOWN])
+
+    counts = np.bincount(labels, minlength=len(GESTURE_LABELS))
+    recalls = correct.reshape(-1, len(GESTURE_LABELS)) / np.maximum(counts, 1)
+    return recalls, counts
+
+# Rata-rata recall untuk gesture yang ada di rekaman (tidak berat sebelah ke gesture dengan frame terbanyak)
+def balanced_accuracy(recalls, counts):
+    present = counts > 0
+    return recalls[..., present].mean(axis=-1)
+
+# Pilih set terbaik; kalau skornya sama, pilih yang paling dekat dengan threshold bawaan
+def best_thresholds(combos, scores, grid):
+    candidates = np.flatnonzero(scores >= scores.max() - 1e-9)
+    distance = np.zeros(len(candidates))
+    for name, values in combos.items():
+        span = float(np.ptp(grid[name])) or 1.0
+        distance += ((values[candidates] - GESTURE_THRESHOLDS[name]) / span) ** 2
+    best = candidates[np.argmin(distance)]
+    return {name: round(float(values[best]), 6) for name, values in combos.items()}, float(scores[best])
+
+# =========================
+# LAPORAN CONFUSION MATRIX
+# =========================
+
+def confusion_matrix(labels, predicted):
+    num_labels = len(GESTURE_LABELS)
+    return np.bincount(labels.astype(np.int64) * num_labels + predicted.astype(np.int64),
+                       minlength=num_labels * num_labels).reshape(num_labels, num_labels)
+
+def print_confusion_matrix(title, matrix):
+    names = [label.split()[0][:8] for label in GESTURE_LABELS]
+    print(f"\n{title} (baris = label asli, kolom = hasil deteksi)")
+    print(f"{'':<10}" + "".join(f"{name:>9}" for name in names))
+    for name, row in zip(names, matrix):
+        if row.sum() == 0:
+            continue
+        print(f"{name:<10}" + "".join(f"{value:>9}" for value in row))
+
+def calibrate(paths, user, grid=None, output_path=None):
+    grid = grid or DEFAULT_GRID
+    points, labels = load_recordings(paths)
+    combos = threshold_grid(grid)
+    num_sets = len(next(iter(combos.values())))
+    print(f"{len(labels)} frame, {num_sets} kombinasi threshold")
+
+    start = time.perf_counter()
+    recalls, counts = sweep_thresholds(points, labels, grid)
+    scores = balanced_accuracy(recalls, counts)
+    sweep_seconds = time.perf_counter() - start
+    print(f"Sweep selesai dalam {sweep_seconds:.2f} detik")
+
+    thresholds, best_score = best_thresholds(combos, scores, grid)
+    features = gesture_features(points)
+    default_predicted = classify_gesture_features(features, GESTURE_THRESHOLDS)
+    best_predicted = classify_gesture_features(features, thresholds)
+    default_matrix = confusion_matrix(labels, default_predicted)
+    best_matrix = confusion_matrix(labels, best_predicted)
+    default_score = float(np.mean([default_matrix[i, i] / counts[i] for i in range(len(counts)) if counts[i] > 0]))
+
+    print_confusion_matrix("Threshold bawaan", default_matrix)
+    print_confusion_matrix("Threshold kalibrasi", best_matrix)
+    print(f"\nBalanced accuracy: bawaan {default_score:.3f} -> kalibrasi {best_score:.3f}")
+    print(f"Threshold: {thresholds}")
+
+    profile = {
+        'user': user,
+        'thresholds': thresholds,
+        'balanced_accuracy': best_score,
+        'default_balanced_accuracy': default_score,
+        'frames': int(len(labels)),
+        'threshold_sets': int(num_sets),
+        'sweep_seconds': sweep_seconds,
+        'labels': GESTURE_LABELS,
+        'confusion_matrix': best_matrix.tolist(),
+        'default_confusion_matrix': default_matrix.tolist()
+    }
+    if output_path is None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        output_path = os.path.join(PROFILE_DIR, f"{user}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    print(f"Profil disimpan ke {output_path} (jalankan: python main.py --profile {user})")
+    return profile
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rekam landmark berlabel dan kalibrasi threshold gesture")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="rekam landmark satu gesture dari kamera")
+    record_parser.add_argument("--gesture", required=True, help=f"salah satu dari {GESTURE_LABELS}")
+    record_parser.add_argument("--output", required=True, help="file .npz hasil rekaman")
+    record_parser.add_argument("--frames", type=int, default=300)
+    record_parser.add_argument("--new-gesture", action="store_true",
+                               help="rekam gesture baru untuk registry template (python gestures.py add)")
+
+    sweep_parser = subparsers.add_parser("sweep", help="cari threshold terbaik dari rekaman")
+    sweep_parser.add_argument("recordings", nargs="+", help="file .npz atau folder berisi rekaman")
+    sweep_parser.add_argument("--user", required=True, help="nama pemain untuk profil")
+    sweep_parser.add_argument("--output", help="path profil (default profiles/<user>.json)")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record_landmarks(args.output, args.gesture, args.frames, new_gesture=args.new_gesture)
+    else:
+        calibrate(args.recordings, args.user, output_path=args.output)
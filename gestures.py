@@ -0,0 +1,249 @@
+import argparse  # library untuk membaca argumen command line
+import json  # library untuk membaca dan menulis registry gesture
+import os  # library untuk operasi file dan folder
+
+import numpy as np  # library untuk operasi matematika dan array
+
+try:
+    from scipy.spatial import cKDTree  # opsional, untuk indeks KD-tree
+except ImportError:
+    cKDTree = None
+
+# =========================
+# REGISTRY GESTURE BERBASIS TEMPLATE
+# =========================
+
+# Registry disimpan sebagai JSON:
+# {"reject_distance": 0.6,
+#  "gestures": [{"name": "Peace ✌", "image": "peace.png", "aspect_ratio": 1.778, "source": "rekaman",
+#                "templates": [[[x, y, z] x 21], ...]}, ...]}
+# Template adalah landmark MediaPipe mentah (koordinat ternormalisasi frame), normalisasi dilakukan saat
+# indeks dibangun. "image" adalah nama file di folder resources/ untuk gambar obstacle (boleh kosong).
+# "aspect_ratio" = lebar / tinggi frame saat template direkam. "source" = asal template: "rekaman"
+# (landmark MediaPipe dari kamera), "sintetis" (pose buatan, lihat build_default_registry) atau "campuran".
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REGISTRY_PATH = os.path.join(BASE_DIR, "resources", "gesture_templates.json")
+DEFAULT_REJECT_DISTANCE = 0.6  # jarak (satuan ukuran telapak) maksimal ke template terdekat
+DEFAULT_ASPECT_RATIO = 1280 / 720  # ukuran frame kamera di main.py
+UNKNOWN_GESTURE = "Unknown"
+
+WRIST = 0
+INDEX_FINGER_MCP = 5
+MIDDLE_FINGER_MCP = 9
+PINKY_MCP = 17
+
+# =========================
+# NORMALISASI POSE
+# =========================
+
+# Ubah landmark (jumlah_pose, 21, 3) menjadi vektor fitur (jumlah_pose, 40):
+# x dikali aspect_ratio (lebar / tinggi frame) supaya x dan y berada di skala yang sama, lalu posisi
+# relatif ke pergelangan (wrist) dibagi ukuran telapak (wrist -> pangkal jari tengah), jadi posisi tangan
+# di frame dan jarak ke kamera tidak berpengaruh. Pose dicerminkan (x -> -x) kalau urutan pangkal
+# telunjuk -> kelingking berlawanan arah, jadi tangan kiri dan kanan cocok dengan template yang sama.
+# Nilai z diabaikan karena tidak stabil.
+def normalize_poses(points, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    points = np.array(np.asarray(points, dtype=np.float32)[:, :, :2])
+    points[:, :, 0] *= aspect_ratio
+    relative = points - points[:, WRIST:WRIST + 1, :]
+    palm_size = np.linalg.norm(relative[:, MIDDLE_FINGER_MCP, :], axis=1)
+    relative = relative / np.maximum(palm_size, 1e-6)[:, None, None]
+
+    index_mcp = relative[:, INDEX_FINGER_MCP, :]
+    pinky_mcp = relative[:, PINKY_MCP, :]
+    orientation = index_mcp[:, 0] * pinky_mcp[:, 1] - index_mcp[:, 1] * pinky_mcp[:, 0]
+    relative[orientation < 0, :, 0] *= -1
+    return relative[:, 1:, :].reshape(len(points), -1)
+
+# =========================
+# MUAT DAN SIMPAN REGISTRY
+# =========================
+
+def load_gesture_registry(path=DEFAULT_REGISTRY_PATH):
+    with open(path, encoding="utf-8") as f:
+        registry = json.load(f)
+    registry.setdefault('reject_distance', DEFAULT_REJECT_DISTANCE)
+    for gesture in registry['gestures']:
+        gesture.setdefault('aspect_ratio', DEFAULT_ASPECT_RATIO)
+        gesture.setdefault('source', "rekaman")
+    return registry
+
+def save_gesture_registry(registry, path=DEFAULT_REGISTRY_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(registry, f, ensure_ascii=False, separators=(",", ":"))
+
+# Tambah template pose untuk gesture (gesture baru dibuat kalau belum ada). aspect_ratio adalah
+# lebar / tinggi frame rekaman; kalau gesture sudah ada dengan rasio lain, x disesuaikan ke rasio itu.
+def add_gesture_templates(registry, name, points, image=None, aspect_ratio=DEFAULT_ASPECT_RATIO,
+                          source="rekaman"):
+    points = np.array(points, dtype=np.float64)
+    for gesture in registry['gestures']:
+        if gesture['name'] == name:
+            points[:, :, 0] *= aspect_ratio / gesture['aspect_ratio']
+            gesture['templates'].extend(np.round(points, 4).tolist())
+            if gesture['source'] != source:
+                gesture['source'] = "campuran"
+            if image:
+                gesture['image'] = image
+            return gesture
+    gesture = {'name': name, 'image': image or "", 'aspect_ratio': round(aspect_ratio, 4), 'source': source,
+               'templates': np.round(points, 4).tolist()}
+    registry['gestures'].append(gesture)
+    return gesture
+
+# =========================
+# INDEKS NEAREST NEIGHBOR
+# =========================
+
+# Bangun indeks dari semua template. method: "brute" (perkalian matriks numpy) atau "kdtree" (scipy).
+# aspect_ratio adalah lebar / tinggi frame yang landmark-nya akan dicari (frame game).
+def build_gesture_index(registry, method="brute", aspect_ratio=DEFAULT_ASPECT_RATIO):
+    names = [gesture['name'] for gesture in registry['gestures']]
+    features = []
+    label_index = []
+    for i, gesture in enumerate(registry['gestures']):
+        if not gesture['templates']:
+            continue
+        features.append(normalize_poses(gesture['templates'], gesture.get('aspect_ratio', DEFAULT_ASPECT_RATIO)))
+        label_index.append(np.full(len(gesture['templates']), i, dtype=np.int32))
+    features = np.concatenate(features)
+
+    if method == "kdtree" and cKDTree is None:
+        print("scipy tidak tersedia, indeks gesture memakai brute force numpy.")
+        method = "brute"
+
+    return {
+        'method': method,
+        'names': names,
+        'features': features,
+        'norms': np.einsum('ij,ij->i', features, features),  # |t|^2 tiap template, dihitung sekali
+        'label_index': np.concatenate(label_index),
+        'tree': cKDTree(features) if method == "kdtree" else None,
+        'reject_distance': float(registry['reject_distance']),
+        'aspect_ratio': aspect_ratio
+    }
+
+# Cari template terdekat untuk tiap pose (jumlah_pose, 21, 3). Pose yang terlalu jauh dari semua
+# template dianggap Unknown. Mengembalikan (daftar nama gesture, jarak terdekat).
+def query_gesture_index(index, points):
+    queries = normalize_poses(points, index['aspect_ratio'])
+    if index['tree'] is not None:
+        distance, nearest = index['tree'].query(queries, k=1)
+    else:
+        # |q - t|^2 = |q|^2 + |t|^2 - 2 q.t untuk semua template sekaligus
+        squared = (np.einsum('ij,ij->i', queries, queries)[:, None] + index['norms'][None, :] -
+                   2.0 * queries @ index['features'].T)
+        nearest = np.argmin(squared, axis=1)
+        distance = np.sqrt(np.maximum(squared[np.arange(len(queries)), nearest], 0.0))
+
+    names = [index['names'][index['label_index'][i]] if d <= index['reject_distance'] else UNKNOWN_GESTURE
+             for i, d in zip(nearest, distance)]
+    return names, distance
+
+# =========================
+# TEMPLATE BAWAAN (LIMA GESTURE GAME)
+# =========================
+
+# Template bawaan adalah pose SINTETIS, bukan rekaman kamera: geometri tangan buatan (canonical_pose)
+# dengan variasi acak (jitter_pose). Template ini hanya meniru aturan detect_gesture() untuk lima gesture
+# lama. Untuk hasil yang mengikuti tangan asli, rekam pose dengan calibrate.py lalu tambahkan dengan
+# `python gestures.py add`.
+
+# Pose dasar tangan kanan di frame yang sudah dibalik (cermin), dalam koordinat persegi (x dan y berskala
+# sama): pergelangan di bawah, jari ke atas.
+# Jari lurus = sendi naik lurus dari pangkal, jari menekuk = ujung jari kembali ke bawah sendi PIP.
+_PALM_BASES = {1: (0.46, 0.65), 2: (0.50, 0.64), 3: (0.54, 0.65), 4: (0.58, 0.67)}  # pangkal (MCP) jari
+_EXTENDED_OFFSETS = [(0.0, -0.06), (0.0, -0.10), (0.0, -0.13)]  # PIP, DIP, TIP relatif ke MCP
+_BENT_OFFSETS = [(0.0, -0.04), (0.005, -0.02), (0.005, 0.0)]
+_THUMB_OPEN = [(0.44, 0.76), (0.41, 0.72), (0.39, 0.68), (0.37, 0.64)]  # CMC, MCP, IP, TIP
+_THUMB_TUCKED = [(0.44, 0.76), (0.43, 0.72), (0.45, 0.70), (0.48, 0.74)]
+
+# Jari yang lurus (1 = telunjuk ... 4 = kelingking) dan posisi jempol tiap gesture bawaan
+DEFAULT_GESTURES = [
+    {'name': "Open Hand 🖐", 'image': "open hand.png", 'extended': {1, 2, 3, 4}, 'thumb_open': True},
+    {'name': "Peace ✌", 'image': "peace.png", 'extended': {1, 2}, 'thumb_open': False},
+    {'name': "Metal 🤘", 'image': "metal.png", 'extended': {1, 4}, 'thumb_open': True},
+    {'name': "Fist ✊", 'image': "fist.png", 'extended': set(), 'thumb_open': False},
+    {'name': "Pointing 👆", 'image': "pointing.png", 'extended': {1}, 'thumb_open': False},
+]
+
+def canonical_pose(extended, thumb_open):
+    pose = np.zeros((21, 3), dtype=np.float64)
+    pose[WRIST, :2] = (0.50, 0.80)
+    pose[1:5, :2] = _THUMB_OPEN if thumb_open else _THUMB_TUCKED
+    for finger, (base_x, base_y) in _PALM_BASES.items():
+        mcp = 1 + finger * 4
+        pose[mcp, :2] = (base_x, base_y)
+        offsets = _EXTENDED_OFFSETS if finger in extended else _BENT_OFFSETS
+        for joint, (dx, dy) in enumerate(offsets, start=1):
+            pose[mcp + joint, :2] = (base_x + dx, base_y + dy)
+            pose[mcp + joint, 2] = 0.0 if finger in extended else -0.02 * joint
+    return pose
+
+# Ubah pose dari koordinat persegi ke koordinat ternormalisasi frame dengan rasio lebar / tinggi tertentu
+def to_frame_coordinates(pose, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    converted = np.array(pose, dtype=np.float64)
+    converted[..., 0] = 0.5 + (converted[..., 0] - 0.5) / aspect_ratio
+    return converted
+
+# Variasi pose: rotasi kecil, skala, geser posisi, dan noise per landmark (dalam koordinat persegi)
+def jitter_pose(pose, rng, max_rotation_deg=12.0, noise=0.004):
+    angle = np.deg2rad(rng.uniform(-max_rotation_deg, max_rotation_deg))
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    wrist = pose[WRIST, :2]
+    jittered = pose.copy()
+    jittered[:, :2] = (pose[:, :2] - wrist) @ rotation.T * rng.uniform(0.7, 1.4) + wrist
+    jittered[:, :2] += rng.uniform(-0.15, 0.15, size=2) + rng.normal(0.0, noise, size=(21, 2))
+    return jittered
+
+# Buat registry bawaan (sintetis) untuk frame 16:9. Hanya variasi yang juga dikenali aturan
+# detect_gesture() yang disimpan, supaya mode template berperilaku sama dengan aturan lama.
+def build_default_registry(per_gesture=40, seed=0, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    from main import detect_gestures_batch  # diimpor di sini karena main.py juga mengimpor modul ini
+
+    rng = np.random.default_rng(seed)
+    registry = {'reject_distance': DEFAULT_REJECT_DISTANCE, 'gestures': []}
+    for spec in DEFAULT_GESTURES:
+        base = canonical_pose(spec['extended'], spec['thumb_open'])
+        templates = [to_frame_coordinates(base, aspect_ratio)]
+        while len(templates) < per_gesture:
+            candidate = to_frame_coordinates(jitter_pose(base, rng), aspect_ratio)
+            if detect_gestures_batch(candidate[None])[0] == spec['name']:
+                templates.append(candidate)
+        add_gesture_templates(registry, spec['name'], templates, spec['image'], aspect_ratio, "sintetis")
+    return registry
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kelola registry gesture berbasis template")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_PATH, help="file JSON registry gesture")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="tampilkan gesture dan jumlah template")
+
+    add_parser = subparsers.add_parser("add", help="tambah template dari rekaman .npz (lihat calibrate.py record)")
+    add_parser.add_argument("recording", help="file .npz berisi points (jumlah_frame, 21, 3)")
+    add_parser.add_argument("--name", required=True, help="nama gesture, contoh \"Thumbs Up 👍\"")
+    add_parser.add_argument("--image", help="nama file gambar obstacle di folder resources/")
+    add_parser.add_argument("--step", type=int, default=5, help="ambil satu template tiap N frame")
+
+    default_parser = subparsers.add_parser("build-default", help="buat ulang template bawaan lima gesture")
+    default_parser.add_argument("--per-gesture", type=int, default=40)
+
+    args = parser.parse_args()
+    if args.command == "list":
+        registry = load_gesture_registry(args.registry)
+        for gesture in registry['gestures']:
+            print(f"{gesture['name']:<20} {len(gesture['templates']):>5} template  {gesture['source']:<9} "
+                  f"gambar: {gesture['image'] or '-'}")
+        print(f"reject_distance: {registry['reject_distance']}")
+    elif args.command == "add":
+        registry = load_gesture_registry(args.registry)
+        with np.load(args.recording) as data:
+            points = data['points'][::args.step]
+            aspect_ratio = float(data['aspect_ratio']) if 'aspect_ratio' in data else DEFAULT_ASPECT_RATIO
+        add_gesture_templates(registry, args.name, points, args.image, aspect_ratio)
+        save_gesture_registry(registry, args.registry)
+        print(f"{len(points)} template ditambahkan ke {args.name}")
+    else:
+        save_gesture_registry(build_default_registry(args.per_gesture), args.registry)
+        print(f"Registry bawaan disimpan ke {args.registry}")
@@ -0,0 +1,244 @@
+import argparse  # library untuk membaca argumen command line
+import json  # library untuk membaca anotasi dan menulis hasil
+import os  # library untuk operasi file dan folder
+import time  # library untuk mengukur waktu
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # harness berjalan tanpa perangkat suara
+
+import cv2  # library untuk manipulasi gambar dan video (kamera)
+import pygame  # library untuk suara dan audio
+
+from benchmark import print_summary, summarize_times
+from main import (DETECTION_ZONE_X_END_RATIO, DETECTION_ZONE_X_START_RATIO, DETECTION_ZONE_Y_END_RATIO,
+                  DETECTION_ZONE_Y_START_RATIO, OBSTACLE_SIZE, OBSTACLE_TYPES, STATE_GAMEOVER, collect_hands,
+                  create_hands_detector, create_obstacle, create_player, load_threshold_profile,
+                  update_player)
+from quality import QUALITY_TIERS
+
+# Jumlah frame yang bisa menunggu di buffer capture. Kamera (driver) dan pipeline hanya menyimpan
+# beberapa frame terakhir: kalau pemrosesan lambat, frame lama dibuang dan frame terbaru yang diambil.
+# 1 = seperti read_frame() di pipeline.py (selalu frame terbaru).
+CAPTURE_BUFFER_FRAMES = 2
+
+# =========================
+# ANOTASI KLIP
+# =========================
+
+# File anotasi berupa JSON berisi daftar klip:
+# [{"video": "klip/peace1.mp4", "gesture": "Peace ✌", "onset_frame": 42}, ...]
+# onset_frame = frame pertama saat pose yang benar sudah terbentuk (dihitung manual).
+# Path video relatif terhadap folder file anotasi.
+def load_annotations(path):
+    with open(path, encoding="utf-8") as f:
+        clips = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for clip in clips:
+        clip['video'] = os.path.join(base_dir, clip['video'])
+    return clips
+
+# =========================
+# JALANKAN SATU KLIP
+# =========================
+
+# Obstacle dengan gesture yang diminta, diletakkan diam di tengah zona deteksi saat onset
+def create_zone_obstacle(w, h, gesture):
+    obs = create_obstacle(w, h, 0)
+    obs['x'] = float(w * (DETECTION_ZONE_X_START_RATIO + DETECTION_ZONE_X_END_RATIO) / 2 - OBSTACLE_SIZE / 2)
+    obs['y'] = float(h * (DETECTION_ZONE_Y_START_RATIO + DETECTION_ZONE_Y_END_RATIO) / 2 - OBSTACLE_SIZE / 2)
+    obs['required_gesture'] = gesture
+    for obstacle_type in OBSTACLE_TYPES:
+        if obstacle_type['gesture'] == gesture:
+            obs['image_path'] = obstacle_type['image_path']
+    return obs
+
+# Jalankan klip lewat jalur capture -> hands_detector.process -> detect_gesture -> run_gameplay_loop.
+# Waktu kedatangan frame disimulasikan sesuai FPS klip: kalau pemrosesan lebih lambat dari kamera,
+# frame menunggu di buffer capture (queue), dan frame yang tidak muat di buffer dibuang (dropped).
+def run_clip(clip, config, sounds):
+    cap = cv2.VideoCapture(clip['video'])
+    if not cap.isOpened():
+        raise IOError(f"Tidak dapat membuka klip: {clip['video']}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_interval_ms = 1000.0 / fps
+    buffer_frames = config['buffer_frames']
+
+    detector = create_hands_detector(1, config['model_complexity'], config['min_detection_confidence'],
+                                     config['min_tracking_confidence'])
+    onset = clip['onset_frame']
+    gesture = clip['gesture']
+
+    player = None
+    hand_results = None
+    busy_until_ms = 0.0  # waktu (ms) saat pipeline selesai memproses frame sebelumnya
+    next_frame = 0  # frame berikutnya yang akan diambil dari buffer capture
+    result = {
+        'video': os.path.basename(clip['video']),
+        'gesture': gesture,
+        'onset_frame': onset,
+        'fps': fps,
+        'recognized_frame': None,
+        'score_frame': None,
+        'frames_dropped': 0,  # frame setelah onset yang dibuang dari buffer capture sebelum dikenali
+        'frames_no_hand': 0,  # frame setelah onset tanpa tangan terdeteksi (di bawah confidence MediaPipe)
+        'frames_wrong_gesture': 0,  # frame setelah onset dengan tangan terdeteksi tapi gesture salah
+        'handedness_score': None,  # skor klasifikasi kiri/kanan MediaPipe saat dikenali (bukan confidence deteksi)
+        'retry_triggered': False
+    }
+    timings = {}  # frame -> (waktu_tiba, mulai_proses, selesai_proses) dalam ms
+    misses = []  # (waktu_tiba, alasan) frame yang diproses setelah onset sebelum gesture dikenali
+
+    frame_index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        arrival_ms = frame_index * frame_interval_ms
+
+        # saat pipeline bebas, buffer hanya berisi buffer_frames frame terbaru yang sudah tiba
+        latest_arrived = int(busy_until_ms // frame_interval_ms)
+        next_frame = max(next_frame, latest_arrived - buffer_frames + 1)
+        if frame_index < next_frame:
+            if frame_index >= onset and result['recognized_frame'] is None:
+                result['frames_dropped'] += 1
+            frame_index += 1
+            continue
+        next_frame = frame_index + 1
+
+        start_ms = max(arrival_ms, busy_until_ms)
+        t0 = time.perf_counter()
+
+        frame = cv2.flip(frame, 1)
+        h, w = frame.shape[:2]
+        if hand_results is None or frame_index % (config['inference_skip'] + 1) == 0:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if config['inference_scale'] < 1.0:
+                rgb_frame = cv2.resize(rgb_frame, None, fx=config['inference_scale'], fy=config['inference_scale'],
+                                       interpolation=cv2.INTER_AREA)
+            hand_results = detector.process(rgb_frame)
+        hands = collect_hands(hand_results, w, h)
+        hand = hands[0] if hands else None
+
+        if frame_index >= onset:
+            if player is None:
+                player = create_player(w, h)
+                player['obstacles'] = [create_zone_obstacle(w, h, gesture)]
+                player['speed_x'] = player['speed_y'] = 0  # obstacle diam di zona selama pengukuran
+
+            if result['recognized_frame'] is None:
+                if hand is None:
+                    result['frames_no_hand'] += 1
+                    misses.append((arrival_ms, 'no_hand'))
+                elif hand['gesture'] != gesture:
+                    result['frames_wrong_gesture'] += 1
+                    misses.append((arrival_ms, 'wrong_gesture'))
+                else:
+                    result['recognized_frame'] = frame_index
+                    if hand_results.multi_handedness:
+                        result['handedness_score'] = hand_results.multi_handedness[0].classification[0].score
+
+            state = update_player(player, frame.copy(), 0, w, h, hand, sounds)
+            result['retry_triggered'] = result['retry_triggered'] or player['in_retry_mode']
+            if state == STATE_GAMEOVER:
+                break
+
+        busy_until_ms = start_ms + (time.perf_counter() - t0) * 1000
+        timings[frame_index] = (arrival_ms, start_ms, busy_until_ms)
+
+        if player is not None and player['score'] > 0:
+            result['score_frame'] = frame_index
+            break
+        frame_index += 1
+
+    cap.release()
+    detector.close()
+
+    # uraikan latensi: jeda frame sampai dikenali (deteksi/confidence) + antrian + waktu proses
+    onset_arrival_ms = onset * frame_interval_ms
+    for event in ('recognized', 'score'):
+        event_frame = result[f'{event}_frame']
+        if event_frame is None:
+            result[f'{event}_frames'] = None
+            result[f'{event}_ms'] = None
+            continue
+        arrival_ms, start_ms, finish_ms = timings[event_frame]
+        result[f'{event}_frames'] = event_frame - onset
+        result[f'{event}_ms'] = finish_ms - onset_arrival_ms
+        result[f'{event}_detection_ms'] = arrival_ms - onset_arrival_ms
+        result[f'{event}_queue_ms'] = start_ms - arrival_ms
+        result[f'{event}_processing_ms'] = finish_ms - start_ms
+
+    # uraikan jeda deteksi: tiap frame yang gagal dikenali menanggung waktu sampai frame berikutnya
+    # yang diproses. Jeda dari onset ke frame pertama yang diproses berasal dari frame yang dibuang.
+    if result['recognized_frame'] is not None:
+        recognized_arrival_ms = timings[result['recognized_frame']][0]
+        first_arrival_ms = misses[0][0] if misses else recognized_arrival_ms
+        split = {'dropped': first_arrival_ms - onset_arrival_ms, 'no_hand': 0.0, 'wrong_gesture': 0.0}
+        for (arrival_ms, reason), next_arrival_ms in zip(misses, [m[0] for m in misses[1:]] + [recognized_arrival_ms]):
+            split[reason] += next_arrival_ms - arrival_ms
+        for reason, value in split.items():
+            result[f'recognized_{reason}_ms'] = value
+    return result
+
+# =========================
+# LAPORAN
+# =========================
+
+def summarize_clips(results):
+    summary = {}
+    for key in ('recognized_frames', 'recognized_ms', 'recognized_detection_ms', 'recognized_queue_ms',
+                'recognized_dropped_ms', 'recognized_no_hand_ms', 'recognized_wrong_gesture_ms',
+                'score_frames', 'score_ms', 'score_detection_ms', 'score_queue_ms', 'score_processing_ms'):
+        summary[key] = summarize_times([r[key] for r in results if r.get(key) is not None])
+    summary['clips'] = len(results)
+    summary['never_recognized'] = sum(1 for r in results if r['recognized_frame'] is None)
+    summary['never_scored'] = sum(1 for r in results if r['score_frame'] is None)
+    summary['retry_triggered'] = sum(1 for r in results if r['retry_triggered'])
+    return summary
+
+def measure_latency(annotation_path, config, output_path):
+    pygame.mixer.init()
+    sounds = {'score': None, 'warning': None, 'gameover': None}  # tanpa suara supaya waktu tidak terganggu
+
+    results = []
+    for clip in load_annotations(annotation_path):
+        result = run_clip(clip, config, sounds)
+        results.append(result)
+        print(f"{result['video']}: dikenali +{result['recognized_frames']} frame, skor +{result['score_frames']} frame")
+
+    report = {'config': config, 'summary': summarize_clips(results), 'clips': results}
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for key in ('recognized_ms', 'recognized_dropped_ms', 'recognized_no_hand_ms', 'recognized_wrong_gesture_ms',
+                'score_ms', 'score_detection_ms', 'score_queue_ms', 'score_processing_ms'):
+        print_summary(key, report['summary'][key])
+    print(f"Hasil ditulis ke {output_path}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur latensi gesture -> skor dari klip berlabel")
+    parser.add_argument("annotations", help="file JSON anotasi klip")
+    parser.add_argument("--output", default="latency.json", help="file JSON hasil")
+    parser.add_argument("--tier", type=int, default=0,
+                        help="tingkat kualitas dari quality.QUALITY_TIERS (model, resolusi, lewati frame)")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.7)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.7)
+    parser.add_argument("--profile", help="profil threshold gesture hasil calibrate.py")
+    parser.add_argument("--buffer-frames", type=int, default=CAPTURE_BUFFER_FRAMES,
+                        help="jumlah frame yang bisa menunggu di buffer capture (1 = selalu frame terbaru)")
+    args = parser.parse_args()
+    if args.profile:
+        load_threshold_profile(args.profile)
+
+    tier = QUALITY_TIERS[args.tier]
+    config = {
+        'tier': args.tier,
+        'model_complexity': tier['model_complexity'],
+        'inference_scale': tier['inference_scale'],
+        'inference_skip': tier['inference_skip'],
+        'min_detection_confidence': args.min_detection_confidence,
+        'min_tracking_confidence': args.min_tracking_confidence,
+        'profile': args.profile,
+        'buffer_frames': args.buffer_frames
+    }
+    measure_latency(args.annotations, config, args.output)
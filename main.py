@@ -5,6 +5,13 @@ import time  # library untuk waktu dan delay
 import random  # library untuk membuat pilihan secara acak
 import pygame  # library untuk suara dan audio
 import os  # library untuk operasi file dan folder
+import argparse  # library untuk membaca argumen command line
+import json  # library untuk membaca profil threshold
+
+from quality import (WAIT_KEY_MS, create_quality_governor, current_quality, update_quality_governor,
+                     parse_stage_delays, inject_stage_delay)
+from gestures import (DEFAULT_ASPECT_RATIO, DEFAULT_REGISTRY_PATH, build_gesture_index, load_gesture_registry,
+                      query_gesture_index)
 
 # =========================
 # BAGIAN INISIALISASI AUDIO
@@ -57,6 +64,7 @@ RETRY_ADVANCE_SPEED_Y = 3.0
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # direktori utama script
 RESOURCE_DIR = os.path.join(BASE_DIR, "resources")  # folder sumber daya
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")  # folder profil threshold gesture per pemain
 
 # Daftar obstacle dengan gesture dan gambar yang sesuai
 OBSTACLE_TYPES = [
@@ -76,6 +84,13 @@ JOKES = [
     "Saya tidak malas, saya cuma optimasi waktu."
 ]
 
+# Mode dua pemain: tiap pemain punya jalur (lane) sendiri di setengah layar
+MAX_PLAYERS = 2  # jumlah tangan maksimal yang dilacak sekaligus
+HAND_TRACK_MAX_DISTANCE = 250  # jarak maksimal (pixel) pergelangan antar frame agar dianggap tangan yang sama
+HAND_TRACK_HANDEDNESS_PENALTY = 150  # tambahan jarak jika label kiri/kanan tangan berbeda
+HAND_TRACK_MAX_MISSED = 15  # jumlah frame tangan boleh hilang sebelum id-nya dilepas
+PLAYER_COLORS = [(255, 120, 0), (0, 200, 255)]  # warna penanda tiap pemain (BGR)
+
 # Status game (menu, cara main, bermain, game over)
 STATE_MENU = 0
 STATE_INSTRUCTIONS = 1
@@ -182,82 +197,232 @@ def create_obstacle(frame_width, frame_height, obstacle_id):
 # LOGIKA PENDETEKSI GESTURE TANGAN
 # =========================
 
-def detect_gesture(landmarks):
-    mp_hands = mp.solutions.hands
-
-    finger_tips = [
-        mp_hands.HandLandmark.THUMB_TIP, mp_hands.HandLandmark.INDEX_FINGER_TIP,
-        mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_TIP,
-        mp_hands.HandLandmark.PINKY_TIP
-    ]
-    finger_pips = [
-        mp_hands.HandLandmark.THUMB_IP, mp_hands.HandLandmark.INDEX_FINGER_PIP,
-        mp_hands.HandLandmark.MIDDLE_FINGER_PIP, mp_hands.HandLandmark.RING_FINGER_PIP,
-        mp_hands.HandLandmark.PINKY_PIP
-    ]
+HAND_LANDMARK = mp.solutions.hands.HandLandmark
+FINGER_TIPS = [HAND_LANDMARK.THUMB_TIP, HAND_LANDMARK.INDEX_FINGER_TIP, HAND_LANDMARK.MIDDLE_FINGER_TIP,
+               HAND_LANDMARK.RING_FINGER_TIP, HAND_LANDMARK.PINKY_TIP]
+FINGER_PIPS = [HAND_LANDMARK.THUMB_IP, HAND_LANDMARK.INDEX_FINGER_PIP, HAND_LANDMARK.MIDDLE_FINGER_PIP,
+               HAND_LANDMARK.RING_FINGER_PIP, HAND_LANDMARK.PINKY_PIP]
+
+# Ubah daftar landmark MediaPipe (satu per tangan) menjadi array numpy bentuk (jumlah_tangan, 21, 3)
+def landmarks_to_array(hand_landmark_lists):
+    if not hand_landmark_lists:
+        return np.empty((0, 21, 3), dtype=np.float64)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in landmarks] for landmarks in hand_landmark_lists],
+                    dtype=np.float64)
+
+# Batas (threshold) aturan gesture. Bisa diganti profil hasil kalibrasi per pemain (lihat calibrate.py)
+GESTURE_THRESHOLDS = {
+    'finger_margin': 0.02,  # toleransi ujung jari vs sendi PIP untuk jari terbuka/menekuk
+    'thumb_dist': 0.005,  # jarak x minimal ujung jempol agar dianggap terbuka
+    'thumb_y': 0.03,  # toleransi y ujung jempol vs sendi IP
+    'pointing_thumb': 0.2  # jarak x maksimal jempol ke pangkal telunjuk untuk Pointing
+}
+
+# Urutan pengecekan aturan (yang pertama cocok yang dipakai), indeks terakhir = tidak dikenali
+GESTURE_LABELS = ["Pointing 👆", "Peace ✌", "Metal 🤘", "Open Hand 🖐", "Fist ✊", "Unknown"]
+GESTURE_UNKNOWN = len(GESTURE_LABELS) - 1
+
+# Hitung besaran yang dipakai aturan gesture dari array landmark bentuk (jumlah_tangan, 21, 3)
+def gesture_features(points):
+    x = points[:, :, 0]
+    y = points[:, :, 1]
+    thumb_tip_x = x[:, HAND_LANDMARK.THUMB_TIP]
+    return {
+        'finger_dy': y[:, FINGER_TIPS] - y[:, FINGER_PIPS],  # bentuk (jumlah_tangan, 5)
+        'index_up': ((y[:, HAND_LANDMARK.INDEX_FINGER_TIP] < y[:, HAND_LANDMARK.INDEX_FINGER_PIP]) &
+                     (y[:, HAND_LANDMARK.INDEX_FINGER_PIP] < y[:, HAND_LANDMARK.INDEX_FINGER_MCP])),
+        'thumb_mcp_dx': np.abs(thumb_tip_x - x[:, HAND_LANDMARK.THUMB_MCP]),
+        'thumb_ip_dx': np.abs(thumb_tip_x - x[:, HAND_LANDMARK.THUMB_IP]),
+        'thumb_ip_dy': y[:, HAND_LANDMARK.THUMB_TIP] - y[:, HAND_LANDMARK.THUMB_IP],
+        'thumb_index_dx': np.abs(thumb_tip_x - x[:, HAND_LANDMARK.INDEX_FINGER_MCP])
+    }
 
-    # Cek apakah jari terbuka (extended) atau menekuk (bent)
-    def is_finger_extended(tip_idx, pip_idx):
-        return landmarks[tip_idx].y < landmarks[pip_idx].y + 0.02
+# Kondisi dasar aturan gesture. Tiap kondisi hanya bergantung pada satu threshold, jadi nilai threshold
+# boleh skalar atau array bentuk (jumlah_nilai, 1) -> hasil (jumlah_nilai, jumlah_tangan).
+def gesture_conditions(features, thresholds):
+    margin = thresholds['finger_margin']
+    finger_dy = features['finger_dy']
+    return {
+        # Cek apakah jari terbuka (extended) atau menekuk (bent), per jari (0 = jempol ... 4 = kelingking)
+        'extended': [finger_dy[:, i] < margin for i in range(5)],
+        'bent': [finger_dy[:, i] > -margin for i in range(5)],
+        'thumb_mcp_open': features['thumb_mcp_dx'] > thresholds['thumb_dist'],
+        'thumb_ip_open': features['thumb_ip_dx'] > thresholds['thumb_dist'],
+        'thumb_y_ok': features['thumb_ip_dy'] < thresholds['thumb_y'],
+        'thumb_near_index': features['thumb_index_dx'] < thresholds['pointing_thumb'],
+        'index_up': features['index_up']
+    }
 
-    def is_finger_bent(tip_idx, pip_idx):
-        return landmarks[tip_idx].y > landmarks[pip_idx].y - 0.02
+# Gabungkan kondisi dasar menjadi aturan tiap gesture, urut sesuai GESTURE_LABELS.
+# Hanya memakai & dan ~, jadi bisa dipakai untuk array boolean maupun bitset (lihat calibrate.py).
+def gesture_rules(conditions):
+    extended = conditions['extended']
+    bent = conditions['bent']
+    thumb_open = conditions['thumb_mcp_open'] & conditions['thumb_y_ok']
+
+    # Pointing 👆
+    pointing = conditions['index_up'] & bent[2] & bent[3] & bent[4] & conditions['thumb_near_index']
+
+    # Peace ✌
+    peace = extended[1] & extended[2] & bent[3] & bent[4] & conditions['thumb_ip_open']
+
+    # Metal 🤘
+    metal = extended[1] & bent[2] & bent[3] & extended[4] & thumb_open
+
+    # Open Hand 🖐
+    open_hand = extended[1] & extended[2] & extended[3] & extended[4] & thumb_open
+
+    # Fist ✊ (tangan mengepal)
+    fist = bent[1] & bent[2] & bent[3] & bent[4] & ~thumb_open
+
+    return [pointing, peace, metal, open_hand, fist]
+
+# Terapkan aturan gesture, hasilnya indeks GESTURE_LABELS (aturan yang lebih awal menang)
+def classify_gesture_features(features, thresholds):
+    rules = gesture_rules(gesture_conditions(features, thresholds))
+    result = np.full(np.broadcast(*rules).shape, GESTURE_UNKNOWN, dtype=np.int8)
+    for index in reversed(range(len(rules))):
+        result = np.where(rules[index], np.int8(index), result)
+    return result
+
+# Indeks template gesture (lihat gestures.py). None = pakai aturan if bawaan di atas.
+GESTURE_INDEX = None
+
+# Klasifikasi gesture semua tangan sekaligus dalam satu operasi numpy (vektorisasi)
+def detect_gestures_batch(points, thresholds=None):
+    if len(points) == 0:
+        return []
+    if GESTURE_INDEX is not None and thresholds is None:
+        return query_gesture_index(GESTURE_INDEX, points)[0]
+    indices = classify_gesture_features(gesture_features(points), thresholds or GESTURE_THRESHOLDS)
+    return [GESTURE_LABELS[i] for i in indices]
+
+# Muat profil threshold hasil kalibrasi (nama pemain di folder profiles/ atau path file JSON)
+def load_threshold_profile(name_or_path):
+    path = name_or_path
+    if not os.path.exists(path):
+        path = os.path.join(PROFILE_DIR, f"{name_or_path}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading profil threshold: {e}")  # tetap pakai threshold bawaan
+        return False
+
+    for key, value in profile.get('thresholds', {}).items():
+        if key in GESTURE_THRESHOLDS:
+            GESTURE_THRESHOLDS[key] = float(value)
+    print(f"Profil threshold dimuat dari {path}: {GESTURE_THRESHOLDS}")
+    return True
+
+# Pakai registry template gesture (nearest neighbor) menggantikan aturan if. Obstacle diambil dari
+# gesture di registry yang punya gambar, jadi gesture baru cukup ditambahkan ke file registry.
+# aspect_ratio = lebar / tinggi frame kamera, supaya landmark dibandingkan di skala x dan y yang sama
+def use_gesture_templates(path=DEFAULT_REGISTRY_PATH, method="brute", aspect_ratio=DEFAULT_ASPECT_RATIO):
+    global GESTURE_INDEX
+    try:
+        registry = load_gesture_registry(path)
+    except (OSError, ValueError) as e:
+        print(f"Error loading registry gesture: {e}")  # tetap pakai aturan bawaan
+        return False
+
+    GESTURE_INDEX = build_gesture_index(registry, method, aspect_ratio)
+    obstacle_types = []
+    for gesture in registry['gestures']:
+        image_path = os.path.join(RESOURCE_DIR, gesture['image']) if gesture['image'] else ""
+        if image_path and os.path.exists(image_path):
+            obstacle_types.append({'gesture': gesture['name'], 'image_path': image_path})
+        else:
+            print(f"Gesture {gesture['name']} tidak punya gambar, tidak dipakai sebagai obstacle.")
+    if obstacle_types:
+        OBSTACLE_TYPES[:] = obstacle_types  # ubah isi list supaya modul lain ikut melihat
+    print(f"Registry gesture dimuat dari {path}: {len(GESTURE_INDEX['names'])} gesture, "
+          f"{len(GESTURE_INDEX['features'])} template")
+    return True
 
-    def is_thumb_open_general():
-        thumb_x_dist = abs(landmarks[mp_hands.HandLandmark.THUMB_TIP].x - landmarks[mp_hands.HandLandmark.THUMB_MCP].x)
-        thumb_y_pos_check = landmarks[mp_hands.HandLandmark.THUMB_TIP].y < landmarks[mp_hands.HandLandmark.THUMB_IP].y + 0.03
-        return thumb_x_dist > 0.005 and thumb_y_pos_check
+def detect_gesture(landmarks):
+    return detect_gestures_batch(landmarks_to_array([landmarks]))[0]
 
-    # Deteksi gesture Pointing 👆
-    index_pointing_up = (
-        landmarks[mp_hands.HandLandmark.INDEX_FINGER_TIP].y < landmarks[mp_hands.HandLandmark.INDEX_FINGER_PIP].y and
-        landmarks[mp_hands.HandLandmark.INDEX_FINGER_PIP].y < landmarks[mp_hands.HandLandmark.INDEX_FINGER_MCP].y
-    )
-    other_fingers_bent = (
-        is_finger_bent(finger_tips[2], finger_pips[2]) and
-        is_finger_bent(finger_tips[3], finger_pips[3]) and
-        is_finger_bent(finger_tips[4], finger_pips[4])
-    )
-    thumb_pointing_pos = abs(landmarks[mp_hands.HandLandmark.THUMB_TIP].x - landmarks[mp_hands.HandLandmark.INDEX_FINGER_MCP].x) < 0.2
-    if index_pointing_up and other_fingers_bent and thumb_pointing_pos:
-        return "Pointing 👆"
-
-    # Deteksi gesture Peace ✌
-    peace_thumb_check = abs(landmarks[mp_hands.HandLandmark.THUMB_TIP].x - landmarks[mp_hands.HandLandmark.THUMB_IP].x) > 0.005
-    if (is_finger_extended(finger_tips[1], finger_pips[1]) and
-            is_finger_extended(finger_tips[2], finger_pips[2]) and
-            is_finger_bent(finger_tips[3], finger_pips[3]) and
-            is_finger_bent(finger_tips[4], finger_pips[4]) and
-            peace_thumb_check):
-        return "Peace ✌"
-
-    # Deteksi gesture Metal 🤘
-    if (is_finger_extended(finger_tips[1], finger_pips[1]) and
-            is_finger_bent(finger_tips[2], finger_pips[2]) and
-            is_finger_bent(finger_tips[3], finger_pips[3]) and
-            is_finger_extended(finger_tips[4], finger_pips[4]) and
-            is_thumb_open_general()):
-        return "Metal 🤘"
-
-    # Deteksi gesture Open Hand 🖐
-    if (is_finger_extended(finger_tips[1], finger_pips[1]) and
-            is_finger_extended(finger_tips[2], finger_pips[2]) and
-            is_finger_extended(finger_tips[3], finger_pips[3]) and
-            is_finger_extended(finger_tips[4], finger_pips[4]) and
-            is_thumb_open_general()):
-        return "Open Hand 🖐"
-
-    # Deteksi gesture Fist ✊ (tangan mengepal)
-    all_fingers_bent = (
-        is_finger_bent(finger_tips[1], finger_pips[1]) and
-        is_finger_bent(finger_tips[2], finger_pips[2]) and
-        is_finger_bent(finger_tips[3], finger_pips[3]) and
-        is_finger_bent(finger_tips[4], finger_pips[4])
-    )
-    if all_fingers_bent and not is_thumb_open_general():
-        return "Fist ✊"
+# =========================
+# PELACAKAN BANYAK TANGAN
+# =========================
 
-    return "Unknown"  # gesture tidak dikenali
+# Kumpulkan semua tangan yang terdeteksi di frame: posisi pergelangan, label kiri/kanan, gesture
+def collect_hands(hand_results, width, height):
+    if not hand_results.multi_hand_landmarks:
+        return []
+
+    landmark_lists = [hand_landmarks.landmark for hand_landmarks in hand_results.multi_hand_landmarks]
+    gestures = detect_gestures_batch(landmarks_to_array(landmark_lists))  # satu panggilan untuk semua tangan
+
+    hands = []
+    for i, hand_landmarks in enumerate(hand_results.multi_hand_landmarks):
+        handedness = ""
+        if hand_results.multi_handedness and i < len(hand_results.multi_handedness):
+            handedness = hand_results.multi_handedness[i].classification[0].label
+        wrist = hand_landmarks.landmark[HAND_LANDMARK.WRIST]
+        hands.append({
+            'landmarks': hand_landmarks,
+            'x': int(wrist.x * width),
+            'y': int(wrist.y * height),
+            'handedness': handedness,
+            'gesture': gestures[i]
+        })
+    return hands
+
+# Beri id tetap ke tiap tangan: cocokkan dengan track lama berdasarkan jarak pergelangan terdekat
+# dan label kiri/kanan. Tangan baru mendapat id sesuai lane tempat pergelangannya berada.
+# Mengembalikan dict {id_tangan: data_tangan}; `tracks` diperbarui langsung.
+def track_hands(tracks, hands, max_hands, lane_width):
+    assigned = {}
+    used_hands = set()  # indeks tangan yang sudah dapat id
+    track_ids = list(tracks.keys())
+
+    if track_ids and hands:
+        track_pos = np.array([tracks[t]['pos'] for t in track_ids], dtype=np.float64)
+        hand_pos = np.array([(hand['x'], hand['y']) for hand in hands], dtype=np.float64)
+        cost = np.linalg.norm(track_pos[:, None, :] - hand_pos[None, :, :], axis=2)
+        mismatch = np.array([[tracks[t]['handedness'] != hand['handedness'] for hand in hands]
+                             for t in track_ids])
+        cost = cost + mismatch * HAND_TRACK_HANDEDNESS_PENALTY
+
+        # pasangkan secara greedy mulai dari jarak paling kecil
+        for flat_idx in np.argsort(cost, axis=None):
+            t_idx, h_idx = np.unravel_index(flat_idx, cost.shape)
+            if cost[t_idx, h_idx] > HAND_TRACK_MAX_DISTANCE:
+                break
+            hand_id = track_ids[t_idx]
+            if hand_id in assigned or h_idx in used_hands:
+                continue
+            assigned[hand_id] = hands[h_idx]
+            used_hands.add(h_idx)
+
+    # tangan yang belum punya pasangan diberi id yang masih kosong, atau mengambil alih track yang sedang
+    # hilang (missed > 0) supaya tangan yang muncul lagi jauh dari posisi terakhir tidak diabaikan.
+    # Utamakan id lane tempat tangan berada, lalu id yang belum punya track.
+    for h_idx, hand in enumerate(hands):
+        if h_idx in used_hands:
+            continue
+        free_ids = [i for i in range(max_hands)
+                    if i not in assigned and (i not in tracks or tracks[i]['missed'] > 0)]
+        if not free_ids:
+            continue
+        preferred = min(max(hand['x'] // lane_width, 0), max_hands - 1)
+        if preferred not in free_ids:
+            preferred = min(free_ids, key=lambda i: i in tracks)
+        assigned[preferred] = hand
+        used_hands.add(h_idx)
+
+    # perbarui track: yang cocok direset, yang hilang terlalu lama dihapus
+    for hand_id in list(tracks.keys()):
+        if hand_id not in assigned:
+            tracks[hand_id]['missed'] += 1
+            if tracks[hand_id]['missed'] > HAND_TRACK_MAX_MISSED:
+                del tracks[hand_id]
+    for hand_id, hand in assigned.items():
+        tracks[hand_id] = {'pos': (hand['x'], hand['y']), 'handedness': hand['handedness'], 'missed': 0}
+
+    return assigned
 
 # =========================
 # EVENT HANDLE MOUSE
@@ -276,20 +441,25 @@ def mouse_callback(event, x, y, flags, param):
 # GAMBARAN ANTARMUKA (UI)
 # =========================
 
-def draw_detection_zone(img, width, height):
+def draw_detection_zone(img, width, height, effects=True):
     x_start = int(width * DETECTION_ZONE_X_START_RATIO)
     x_end = int(width * DETECTION_ZONE_X_END_RATIO)
     y_start = int(height * DETECTION_ZONE_Y_START_RATIO)
     y_end = int(height * DETECTION_ZONE_Y_END_RATIO)
 
-    pulse_thickness = 4 + int(3 * abs(np.sin(time.time() * 5)))
-    pulse_value = int(150 + 105 * abs(np.sin(time.time() * 3)))
-    color = (pulse_value, pulse_value, 255)
+    if effects:
+        pulse_thickness = 4 + int(3 * abs(np.sin(time.time() * 5)))
+        pulse_value = int(150 + 105 * abs(np.sin(time.time() * 3)))
+        color = (pulse_value, pulse_value, 255)
 
-    overlay = img.copy()
-    alpha = 0.2
-    cv2.rectangle(overlay, (x_start, y_start), (x_end, y_end), color, -1)
-    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+        overlay = img.copy()
+        alpha = 0.2
+        cv2.rectangle(overlay, (x_start, y_start), (x_end, y_end), color, -1)
+        cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+    else:
+        # mode ringan: tanpa denyut dan tanpa overlay transparan (tidak perlu salin frame)
+        pulse_thickness = 4
+        color = (200, 200, 255)
     cv2.rectangle(img, (x_start, y_start), (x_end, y_end), color, pulse_thickness)
 
     font = cv2.FONT_HERSHEY_SIMPLEX
@@ -308,7 +478,8 @@ def draw_hud_panel(img, width, height):
     cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
     cv2.line(img, (0, panel_height), (width, panel_height), (80, 80, 120), 2)
 
-def render_menu_screen(img, w, h, btn_start_x, btn_start_y, btn_instruction_y, btn_exit_x, btn_exit_y, btn_w, btn_h):
+def render_menu_screen(img, w, h, btn_start_x, btn_start_y, btn_instruction_y, btn_exit_x, btn_exit_y, btn_w, btn_h,
+                       btn_duo_y):
     overlay = img.copy()
     cv2.rectangle(overlay, (0, 0), (w, h), (10, 10, 40), -1)
     cv2.addWeighted(overlay, 0.85, img, 0.15, 0, img)
@@ -323,11 +494,13 @@ def render_menu_screen(img, w, h, btn_start_x, btn_start_y, btn_instruction_y, b
     y = h // 2 - 200
     draw_text_with_outline(img, title, (x, y), font, font_scale, (255, 255, 255), thickness)
 
-    # tombol mulai game, cara main, dan keluar
+    # tombol mulai game, cara main, mode 2 pemain, dan keluar
     draw_button(img, "Mulai Game", btn_start_x, btn_start_y, btn_w, btn_h,
                 (70, 130, 220), (255, 255, 255), (255, 255, 255), 1.2)
     draw_button(img, "Cara Main", btn_start_x, btn_instruction_y, btn_w, btn_h,
                 (120, 180, 90), (255, 255, 255), (255, 255, 255), 1.2)
+    draw_button(img, "2 Pemain", btn_start_x, btn_duo_y, btn_w, btn_h,
+                (200, 120, 60), (255, 255, 255), (255, 255, 255), 1.2)
     draw_button(img, "Keluar", btn_exit_x, btn_exit_y, btn_w, btn_h,
                 (220, 70, 70), (255, 255, 255), (255, 255, 255), 1.2)
 
@@ -353,7 +526,9 @@ def render_instructions_screen(img, w, h, btn_start_x, btn_w, btn_h):
         "4. Jika salah gesture atau tangan tidak di zona,",
         "   harus koreksi pose pada obstacle yang sama.",
         "5. Maksimal 3 kali gagal, maka game over.",
-        "6. Tekan tombol ESC untuk keluar kapan saja."
+        "6. Mode 2 Pemain: P1 di kiri, P2 di kanan layar.",
+        "   Pemain yang tidak kalah menjadi pemenang.",
+        "7. Tekan tombol ESC untuk keluar kapan saja."
     ]
 
     font_scale_ins = 0.9
@@ -371,10 +546,12 @@ def render_instructions_screen(img, w, h, btn_start_x, btn_w, btn_h):
                 (70, 130, 220), (255, 255, 255), (255, 255, 255), 1.2)
 
 def render_game_info(img, w, h, score, fails, max_fails, hand_detected, player_gesture,
-                     speed_x, speed_y, in_retry_mode, obstacles, stalled_id, stalled_state, sounds):
-    pulse_val = int(200 + 55 * abs(np.sin(time.time() * 3)))
+                     speed_x, speed_y, in_retry_mode, obstacles, stalled_id, stalled_state, sounds,
+                     player_label="", effects=True):
+    pulse_val = int(200 + 55 * abs(np.sin(time.time() * 3))) if effects else 255
     pulse_color = (pulse_val, 255, pulse_val)
-    draw_text_with_outline(img, f"SKOR: {score}", (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, pulse_color, 4)
+    score_text = f"{player_label} SKOR: {score}" if player_label else f"SKOR: {score}"
+    draw_text_with_outline(img, score_text, (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, pulse_color, 4)
     draw_text_with_outline(img, f"Gagal: {fails}/{max_fails}", (w - 280, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 180, 255), 4)
 
     if hand_detected:
@@ -392,13 +569,30 @@ def render_game_info(img, w, h, score, fails, max_fails, hand_detected, player_g
         draw_text_with_outline(img, f"Gesture Anda: {player_gesture}", (w // 2 - 140, h // 2 - 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 3)
         draw_text_with_outline(img, f"Status: {stalled_state.replace('_', ' ').title()}", (w // 2 - 170, h // 2 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
 
-def render_gameover_screen(img, w, h, score, jokes, joke_idx, joke_timer, btn_restart_x, btn_restart_y, btn_exit_x, btn_exit_y, btn_w, btn_h):
+# player_lost (mode 2 pemain): True untuk pemain yang kalah. Pemain yang tidak kalah menang; kalau semua
+# kalah di frame yang sama, pemenang ditentukan dari skor.
+def render_gameover_screen(img, w, h, score, jokes, joke_idx, joke_timer, btn_restart_x, btn_restart_y, btn_exit_x, btn_exit_y, btn_w, btn_h,
+                           player_scores=None, player_lost=None):
     overlay = img.copy()
     cv2.rectangle(overlay, (0, 0), (w, h), (0, 0, 0), -1)
     cv2.addWeighted(overlay, 0.75, img, 0.25, 0, img)
 
     draw_text_with_outline(img, "GAME OVER!", (w // 2 - 180, h // 2 - 120), cv2.FONT_HERSHEY_DUPLEX, 2, (0, 0, 255), 5)
-    draw_text_with_outline(img, f"SKOR AKHIR: {score}", (w // 2 - 160, h // 2 - 50), cv2.FONT_HERSHEY_DUPLEX, 1.3, (255, 255, 255), 4)
+    if player_scores and len(player_scores) > 1:
+        # mode 2 pemain: tampilkan skor tiap pemain dan pemenangnya
+        scores_text = "   ".join(f"P{i + 1}: {s}" for i, s in enumerate(player_scores))
+        survivors = [i for i, lost in enumerate(player_lost or [True] * len(player_scores)) if not lost]
+        if len(survivors) == 1:
+            result_text = f"P{survivors[0] + 1} MENANG!"
+        else:
+            best = max(player_scores)
+            if player_scores.count(best) > 1:
+                result_text = "SERI!"
+            else:
+                result_text = f"P{player_scores.index(best) + 1} MENANG!"
+        draw_text_with_outline(img, f"{scores_text}   {result_text}", (w // 2 - 300, h // 2 - 50), cv2.FONT_HERSHEY_DUPLEX, 1.1, (255, 255, 255), 3)
+    else:
+        draw_text_with_outline(img, f"SKOR AKHIR: {score}", (w // 2 - 160, h // 2 - 50), cv2.FONT_HERSHEY_DUPLEX, 1.3, (255, 255, 255), 4)
 
     # ganti lelucon setiap 4 detik supaya bervariasi
     current_time = int(time.time() * 1000)
@@ -588,19 +782,97 @@ def reset_game(w, h):
         ''  # status stalled kosong
     )
 
+# Buat data satu pemain (skor, obstacle, kecepatan, status retry) dalam bentuk dict
+def create_player(w, h):
+    (_, score, fails, retry_fails, last_failed_obstacle_id, obstacles, obstacle_counter,
+     speed_x, speed_y, _, in_retry_mode, stalled_obstacle_id,
+     stalled_reason, stalled_obstacle_state) = reset_game(w, h)
+    return {
+        'score': score,
+        'fails': fails,
+        'retry_fails': retry_fails,
+        'last_failed_obstacle_id': last_failed_obstacle_id,
+        'in_retry_mode': in_retry_mode,
+        'stalled_obstacle_id': stalled_obstacle_id,
+        'stalled_reason': stalled_reason,
+        'stalled_obstacle_state': stalled_obstacle_state,
+        'obstacles': obstacles,
+        'obstacle_counter': obstacle_counter,
+        'speed_x': speed_x,
+        'speed_y': speed_y,
+        'lost': False  # True saat pemain mencapai MAX_FAILS
+    }
+
+# Jalankan gameplay satu pemain di lane-nya sendiri. `lane_img` adalah potongan (view) dari frame,
+# jadi semua gambar langsung masuk ke frame utama. Posisi tangan diubah ke koordinat lane.
+def update_player(player, lane_img, lane_x, lane_w, h, hand, sounds):
+    hand_detected = hand is not None
+    hand_x = hand['x'] - lane_x if hand_detected else -1
+    hand_y = hand['y'] if hand_detected else -1
+    player_gesture = hand['gesture'] if hand_detected else "Unknown"
+
+    (state, player['score'], player['fails'], player['retry_fails'], player['last_failed_obstacle_id'],
+     player['in_retry_mode'], player['stalled_obstacle_id'], player['stalled_reason'],
+     player['stalled_obstacle_state'], player['obstacles'], player['obstacle_counter'],
+     player['speed_x'], player['speed_y']) = run_gameplay_loop(
+        lane_img, lane_w, h, player['obstacles'], player['obstacle_counter'],
+        hand_detected, hand_x, hand_y, player_gesture,
+        player['score'], player['fails'], player['retry_fails'], player['last_failed_obstacle_id'],
+        player['in_retry_mode'], player['stalled_obstacle_id'], player['stalled_reason'],
+        player['stalled_obstacle_state'], player['speed_x'], player['speed_y'], sounds)
+    return state
+
+# Gambar landmark tangan dan efek lingkaran denyut di pergelangan tangan
+def draw_hand_overlay(img, hand, label, color, mp_drawing, mp_drawing_styles, draw_landmarks=True, effects=True):
+    if draw_landmarks:
+        mp_drawing.draw_landmarks(
+            img, hand['landmarks'], mp.solutions.hands.HAND_CONNECTIONS,
+            mp_drawing_styles.get_default_hand_landmarks_style(),
+            mp_drawing_styles.get_default_hand_connections_style())
+
+    pulse_radius = 15 + int(5 * abs(np.sin(time.time() * 8))) if effects else 15
+    pulse_color_val = int(255 * abs(np.sin(time.time() * 4))) if effects else 255
+    cv2.circle(img, (hand['x'], hand['y']), pulse_radius, (255, pulse_color_val, 255), -1)
+    cv2.putText(img, label, (hand['x'] + 20, hand['y'] - 10),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+# Buat detektor tangan MediaPipe untuk sejumlah tangan tertentu
+def create_hands_detector(max_num_hands, model_complexity=1, min_detection_confidence=0.7,
+                          min_tracking_confidence=0.7):
+    return mp.solutions.hands.Hands(max_num_hands=max_num_hands, model_complexity=model_complexity,
+                                    min_detection_confidence=min_detection_confidence,
+                                    min_tracking_confidence=min_tracking_confidence)
+
 # =========================
 # MAIN GAME LOOP UTAMA
 # =========================
 
-def main():
-    cap = cv2.VideoCapture(0)  # buka kamera default
-    if not cap.isOpened():
-        print("Tidak dapat membuka kamera.")
-        return
-
+def main(multiprocess=False, profile=None, templates=None):
+    if profile:
+        load_threshold_profile(profile)
     width, height = 1280, 720  # set ukuran frame kamera
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if templates:
+        use_gesture_templates(templates, aspect_ratio=width / height)
+    stage_delays = parse_stage_delays()  # delay buatan untuk pengujian, lihat quality.py
+    num_players = 1  # 1 = mode biasa, 2 = mode dua pemain
+
+    if multiprocess:
+        # capture dan inferensi berjalan di proses terpisah, frame lewat shared memory.
+        # diimpor di sini karena pipeline.py juga mengimpor main.py
+        from pipeline import configure_pipeline, read_frame, read_hands, start_pipeline, stop_pipeline
+        pipeline = start_pipeline(0, width, height, num_players, stage_delays=stage_delays,
+                                  classify=detect_gestures_batch)
+        if pipeline is None:
+            print("Tidak dapat membuka kamera.")
+            return
+    else:
+        pipeline = None
+        cap = cv2.VideoCapture(0)  # buka kamera default
+        if not cap.isOpened():
+            print("Tidak dapat membuka kamera.")
+            return
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
 
     window_name = "Gesture Diagonal Obstacle Game"
     cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)  # buat jendela fullscreen
@@ -609,26 +881,22 @@ def main():
 
     sounds = initialize_pygame_audio()  # muat suara
 
-    mp_hands_module = mp.solutions.hands
-    hands_detector = mp_hands_module.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    # quality governor menurunkan/menaikkan kualitas supaya FPS tetap terjaga.
+    # batas waktu frame mengikuti FPS kamera kalau kamera lebih lambat dari target
+    governor = create_quality_governor(source_fps=cap.get(cv2.CAP_PROP_FPS) if pipeline is None else None)
+
+    if pipeline is None:
+        hands_detector = create_hands_detector(num_players, current_quality(governor)['model_complexity'])
+        detector_config = (num_players, current_quality(governor)['model_complexity'])
+    hand_results = None
+    frame_index = 0
     mp_drawing = mp.solutions.drawing_utils
     mp_drawing_styles = mp.solutions.drawing_styles
 
     # variabel awal game
     game_state = STATE_MENU
-    score = 0
-    fails = 0
-    retry_fails = 0
-    last_failed_obstacle_id = None
-    in_retry_mode = False
-    stalled_obstacle_id = -1
-    stalled_reason = ""
-    stalled_obstacle_state = ''
-    obstacles = []
-    obstacle_counter = 0
-    current_speed_x = INITIAL_OBSTACLE_SPEED_X
-    current_speed_y = INITIAL_OBSTACLE_SPEED_Y
-    passed_obstacle_ids = set()
+    players = []  # data tiap pemain, lihat create_player()
+    hand_tracks = {}  # track tangan untuk id tetap di mode dua pemain
     joke_index = 0
     joke_timer_start = 0
 
@@ -637,6 +905,7 @@ def main():
     btn_start_x = width // 2 - btn_w // 2
     btn_start_y = height // 2 - 120
     btn_instruction_y = height // 2 - 40
+    btn_duo_y = height // 2 + 35
     btn_restart_x = btn_start_x
     btn_restart_y = height // 2 + 20
     btn_exit_x = btn_start_x
@@ -647,43 +916,67 @@ def main():
     global mouse_clicked, mouse_x, mouse_y
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Gagal membaca frame dari kamera.")
-            break
+        quality = current_quality(governor)
+
+        # waktu menunggu frame dari kamera tidak dihitung ke governor, hanya waktu kerja frame
+        if pipeline is not None:
+            # frame sudah dibalik di proses capture, landmark terakhir diambil dari slot hasil
+            configure_pipeline(pipeline, num_players, quality)
+            frame = read_frame(pipeline)
+            if frame is None:
+                print("Gagal membaca frame dari kamera.")
+                break
+            frame_start = time.perf_counter()
+            hands = read_hands(pipeline, width, height)  # semua gesture diklasifikasi sekaligus
+            if hands is None:
+                print("Deteksi tangan berhenti, game ditutup.")
+                break
+        else:
+            ret = cap.grab()  # tunggu frame berikutnya dari kamera
+            frame_start = time.perf_counter()
+            if ret:
+                ret, frame = cap.retrieve()  # decode frame
+            if not ret:
+                print("Gagal membaca frame dari kamera.")
+                break
+            inject_stage_delay(stage_delays, 'capture')
+
+            frame = cv2.flip(frame, 1)  # cermin horizontal agar nyaman dilihat
+
+            # ganti detektor kalau jumlah pemain atau kompleksitas model berubah
+            if detector_config != (num_players, quality['model_complexity']):
+                hands_detector.close()
+                hands_detector = create_hands_detector(num_players, quality['model_complexity'])
+                detector_config = (num_players, quality['model_complexity'])
+                hand_results = None
+
+            # inferensi hanya tiap (skip + 1) frame, di antaranya hasil terakhir dipakai ulang
+            if hand_results is None or frame_index % (quality['inference_skip'] + 1) == 0:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if quality['inference_scale'] < 1.0:
+                    # landmark MediaPipe dinormalisasi (0..1), jadi frame kecil tetap memberi posisi yang sama
+                    rgb_frame = cv2.resize(rgb_frame, None, fx=quality['inference_scale'], fy=quality['inference_scale'],
+                                           interpolation=cv2.INTER_AREA)
+                hand_results = hands_detector.process(rgb_frame)  # deteksi tangan
+                inject_stage_delay(stage_delays, 'inference')
+            frame_index += 1
+            hands = collect_hands(hand_results, width, height)  # semua gesture diklasifikasi sekaligus
 
-        frame = cv2.flip(frame, 1)  # cermin horizontal agar nyaman dilihat
         img = frame.copy()  # salin frame untuk gambar game
 
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        hand_results = hands_detector.process(rgb_frame)  # deteksi tangan
-
-        hand_detected = False
-        hand_x, hand_y = -1, -1
-        player_gesture = "Unknown"
+        lane_w = width // num_players
+        player_hands = {}  # {id_pemain: data_tangan}
 
-        if hand_results.multi_hand_landmarks and game_state == STATE_PLAYING:
-            for hand_landmarks in hand_results.multi_hand_landmarks:
-                # gambar landmark tangan di layar
-                mp_drawing.draw_landmarks(
-                    img, hand_landmarks, mp_hands_module.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style())
+        if game_state == STATE_PLAYING:
+            if num_players > 1:
+                player_hands = track_hands(hand_tracks, hands, num_players, lane_w)
+            elif hands:
+                player_hands = {0: hands[0]}
 
-                # ambil posisi pergelangan tangan
-                hand_x = int(hand_landmarks.landmark[mp_hands_module.HandLandmark.WRIST].x * width)
-                hand_y = int(hand_landmarks.landmark[mp_hands_module.HandLandmark.WRIST].y * height)
-                hand_detected = True
-
-                # deteksi gesture tangan
-                player_gesture = detect_gesture(hand_landmarks.landmark)
-
-                # gambar efek lingkaran denyut di pergelangan tangan
-                pulse_radius = 15 + int(5 * abs(np.sin(time.time() * 8)))
-                pulse_color_val = int(255 * abs(np.sin(time.time() * 4)))
-                cv2.circle(img, (hand_x, hand_y), pulse_radius, (255, pulse_color_val, 255), -1)
-                cv2.putText(img, "WRIST", (hand_x + 20, hand_y - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 255), 2)
+            for player_id, hand in player_hands.items():
+                label = f"P{player_id + 1}" if num_players > 1 else "WRIST"
+                draw_hand_overlay(img, hand, label, PLAYER_COLORS[player_id] if num_players > 1 else (255, 0, 255),
+                                  mp_drawing, mp_drawing_styles, quality['draw_landmarks'], quality['effects'])
 
         # --------- LOGIKA UI BERDASARKAN STATUS GAME ---------
 
@@ -691,16 +984,22 @@ def main():
             render_menu_screen(img, width, height,
                                btn_start_x, btn_start_y,
                                btn_instruction_y, btn_exit_x, btn_exit_y,
-                               btn_w, btn_h)
+                               btn_w, btn_h, btn_duo_y)
 
             # cek klik tombol di Home
             if mouse_clicked:
                 if is_click_on_button(mouse_x, mouse_y, btn_start_x, btn_start_y, btn_w, btn_h):
-                    # mulai game baru
-                    (game_state, score, fails, retry_fails, last_failed_obstacle_id,
-                     obstacles, obstacle_counter, current_speed_x, current_speed_y,
-                     passed_obstacle_ids, in_retry_mode, stalled_obstacle_id,
-                     stalled_reason, stalled_obstacle_state) = reset_game(width, height)
+                    # mulai game baru (satu pemain)
+                    num_players = 1
+                    players = [create_player(width, height)]
+                    game_state = STATE_PLAYING
+                    play_sound(sounds['gameover'])
+                elif is_click_on_button(mouse_x, mouse_y, btn_start_x, btn_duo_y, btn_w, btn_h):
+                    # mulai game baru mode dua pemain, tiap pemain dapat setengah layar
+                    num_players = MAX_PLAYERS
+                    players = [create_player(width // num_players, height) for _ in range(num_players)]
+                    hand_tracks = {}
+                    game_state = STATE_PLAYING
                     play_sound(sounds['gameover'])
                 elif is_click_on_button(mouse_x, mouse_y, btn_start_x, btn_instruction_y, btn_w, btn_h):
                     game_state = STATE_INSTRUCTIONS  # masuk ke layar cara main
@@ -719,58 +1018,89 @@ def main():
                 mouse_clicked = False
 
         elif game_state == STATE_PLAYING:
-            # jalankan logika game utama
-            (game_state, score, fails, retry_fails, last_failed_obstacle_id,
-             in_retry_mode, stalled_obstacle_id, stalled_reason, stalled_obstacle_state,
-             obstacles, obstacle_counter, current_speed_x, current_speed_y) = run_gameplay_loop(
-                img, width, height, obstacles, obstacle_counter,
-                hand_detected, hand_x, hand_y, player_gesture,
-                score, fails, retry_fails, last_failed_obstacle_id,
-                in_retry_mode, stalled_obstacle_id, stalled_reason,
-                stalled_obstacle_state, current_speed_x, current_speed_y,
-                sounds)
-
-            # gambar zona deteksi dan panel info game
-            draw_detection_zone(img, width, height)
+            # jalankan logika game utama di lane tiap pemain
+            states = []
+            for player_id, player in enumerate(players):
+                lane_x = player_id * lane_w
+                lane_img = img[:, lane_x:lane_x + lane_w]
+                states.append(update_player(player, lane_img, lane_x, lane_w, height,
+                                            player_hands.get(player_id), sounds))
+
+                # gambar zona deteksi tiap lane
+                draw_detection_zone(lane_img, lane_w, height, quality['effects'])
+
             draw_hud_panel(img, width, height)
 
             # tampilkan info skor, gagal, status tangan, kecepatan, dll
-            render_game_info(img, width, height, score, fails, MAX_FAILS,
-                             hand_detected, player_gesture,
-                             current_speed_x, current_speed_y, in_retry_mode,
-                             obstacles, stalled_obstacle_id, stalled_obstacle_state,
-                             sounds)
+            for player_id, player in enumerate(players):
+                lane_x = player_id * lane_w
+                render_game_info(img[:, lane_x:lane_x + lane_w], lane_w, height,
+                                 player['score'], player['fails'], MAX_FAILS,
+                                 player_id in player_hands,
+                                 player_hands[player_id]['gesture'] if player_id in player_hands else "Unknown",
+                                 player['speed_x'], player['speed_y'], player['in_retry_mode'],
+                                 player['obstacles'], player['stalled_obstacle_id'], player['stalled_obstacle_state'],
+                                 sounds, f"P{player_id + 1}" if num_players > 1 else "", quality['effects'])
+
+            if num_players > 1:
+                # garis pemisah antar lane
+                for player_id in range(1, num_players):
+                    cv2.line(img, (player_id * lane_w, 0), (player_id * lane_w, height), (255, 255, 255), 3)
+
+            # game selesai begitu ada pemain yang kalah
+            for player, state in zip(players, states):
+                player['lost'] = state == STATE_GAMEOVER
+            if STATE_GAMEOVER in states:
+                game_state = STATE_GAMEOVER
 
         elif game_state == STATE_GAMEOVER:
             # layar game over dengan lelucon dan skor akhir
+            player_scores = [player['score'] for player in players]
             joke_index, joke_timer_start = render_gameover_screen(
-                img, width, height, score, JOKES, joke_index, joke_timer_start,
-                btn_restart_x, btn_restart_y, btn_exit_x, btn_exit_y, btn_w, btn_h)
+                img, width, height, player_scores[0], JOKES, joke_index, joke_timer_start,
+                btn_restart_x, btn_restart_y, btn_exit_x, btn_exit_y, btn_w, btn_h,
+                player_scores, [player['lost'] for player in players])
 
             # cek klik tombol mulai ulang atau keluar
             if mouse_clicked:
                 if is_click_on_button(mouse_x, mouse_y, btn_restart_x, btn_restart_y, btn_w, btn_h):
-                    # reset game dan mainkan musik lagi
-                    (game_state, score, fails, retry_fails, last_failed_obstacle_id,
-                     obstacles, obstacle_counter, current_speed_x, current_speed_y,
-                     passed_obstacle_ids, in_retry_mode, stalled_obstacle_id,
-                     stalled_reason, stalled_obstacle_state) = reset_game(width, height)
+                    # reset game dengan jumlah pemain yang sama dan mainkan musik lagi
+                    players = [create_player(width // num_players, height) for _ in range(num_players)]
+                    hand_tracks = {}
+                    game_state = STATE_PLAYING
                     pygame.mixer.music.play(-1)
                     play_sound(sounds['gameover'])
                 elif is_click_on_button(mouse_x, mouse_y, btn_exit_x, btn_exit_y, btn_w, btn_h):
                     break  # keluar program
                 mouse_clicked = False
 
+        inject_stage_delay(stage_delays, 'render')
+
         # tampilkan frame hasil render
         cv2.imshow(window_name, img)
-        key = cv2.waitKey(10)
+        frame_ms = (time.perf_counter() - frame_start) * 1000  # tanpa jeda waitKey
+        key = cv2.waitKey(WAIT_KEY_MS)
         if key == 27:  # tombol ESC untuk keluar kapan saja
             break
 
+        # catat waktu kerja frame ke governor, tingkat kualitas baru berlaku mulai frame berikutnya
+        update_quality_governor(governor, frame_ms)
+
     # selesai, hentikan musik dan tutup semua
     pygame.mixer.music.stop()
-    cap.release()
+    if pipeline is not None:
+        stop_pipeline(pipeline)
+    else:
+        hands_detector.close()
+        cap.release()
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()  # mulai program
+    parser = argparse.ArgumentParser(description="Gesture Diagonal Obstacle Game")
+    parser.add_argument("--multiprocess", action="store_true",
+                        help="jalankan capture, inferensi, dan render di proses terpisah")
+    parser.add_argument("--profile", help="nama pemain (profiles/<nama>.json) atau path profil threshold gesture")
+    parser.add_argument("--templates", nargs="?", const=DEFAULT_REGISTRY_PATH,
+                        help="kenali gesture dengan registry template (default resources/gesture_templates.json)")
+    args = parser.parse_args()
+    main(args.multiprocess, args.profile, args.templates)  # mulai program
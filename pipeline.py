@@ -0,0 +1,372 @@
+import multiprocessing as mproc  # library untuk menjalankan beberapa proses
+import time  # library untuk waktu dan delay
+from multiprocessing import shared_memory  # memori bersama antar proses (tanpa pickling frame)
+
+import cv2  # library untuk manipulasi gambar dan video (kamera)
+import numpy as np  # library untuk operasi matematika dan array
+from mediapipe.framework.formats import landmark_pb2  # format landmark untuk digambar mp_drawing
+
+from main import MAX_PLAYERS, create_hands_detector, detect_gestures_batch
+from quality import inject_stage_delay
+
+# =========================
+# TATA LETAK MEMORI BERSAMA
+# =========================
+
+# Satu blok shared memory berisi (berurutan):
+#   control : int64[CTRL_SIZE]             -> flag stop, nomor urut frame, status proses, pengaturan inferensi
+#   result  : slot hasil landmark terakhir  -> versi (seqlock), nomor frame, jumlah tangan, label, landmark
+#   headers : int64[slots]                 -> nomor urut frame di tiap slot ring (-1 = sedang ditulis)
+#   frames  : uint8[slots, tinggi, lebar, 3] -> ring frame ukuran tetap
+PIPELINE_SLOTS = 4  # jumlah slot di ring frame
+PIPELINE_START_TIMEOUT = 15.0  # detik menunggu proses capture dan inferensi siap
+PIPELINE_STOP_TIMEOUT = 3.0  # detik menunggu proses berhenti sebelum dipaksa (terminate)
+RESULT_READ_SPINS = 1000  # percobaan baca slot hasil tanpa jeda sebelum mulai memberi giliran CPU
+RESULT_READ_TIMEOUT = 0.05  # detik maksimal menunggu slot hasil selesai ditulis
+
+CTRL_STOP = 0  # 1 = semua proses harus berhenti
+CTRL_CAPTURE_SEQ = 1  # nomor urut frame terakhir yang ditulis capture
+CTRL_RENDER_SEQ = 2  # nomor urut frame terakhir yang dibaca render
+CTRL_CAPTURE_STATE = 3  # 0 = mulai, 1 = jalan, 2 = video habis, -1 = gagal membuka kamera
+CTRL_INFERENCE_STATE = 4  # 0 = mulai, 1 = jalan
+CTRL_MAX_HANDS = 5  # jumlah tangan maksimal untuk detektor
+CTRL_MODEL_COMPLEXITY = 6  # model_complexity MediaPipe
+CTRL_INFERENCE_SCALE = 7  # skala resolusi inferensi dalam persen
+CTRL_INFERENCE_SKIP = 8  # jumlah frame yang dilewati di antara dua inferensi
+CTRL_BACKPRESSURE = 9  # 1 = capture menunggu render (tidak ada frame yang dibuang)
+CTRL_INFERENCE_COUNT = 10  # jumlah frame yang sudah diproses inferensi
+CTRL_SIZE = 16
+
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_LABELS = {0: "Left", 1: "Right"}
+
+def _layout_sizes(width, height, slots):
+    control = CTRL_SIZE * 8
+    result = (3 + MAX_PLAYERS) * 8 + MAX_PLAYERS * 21 * 3 * 8
+    headers = slots * 8
+    frames = slots * height * width * 3
+    return control, result, headers, frames
+
+# Buat view numpy ke dalam blok shared memory (tidak menyalin data)
+def _make_views(buf, width, height, slots):
+    control_size, result_size, headers_size, _ = _layout_sizes(width, height, slots)
+    offset = 0
+    views = {'control': np.ndarray((CTRL_SIZE,), dtype=np.int64, buffer=buf, offset=offset)}
+    offset += control_size
+    views['result_meta'] = np.ndarray((3,), dtype=np.int64, buffer=buf, offset=offset)  # versi, nomor frame, jumlah tangan
+    views['result_handedness'] = np.ndarray((MAX_PLAYERS,), dtype=np.int64, buffer=buf, offset=offset + 3 * 8)
+    views['result_points'] = np.ndarray((MAX_PLAYERS, 21, 3), dtype=np.float64, buffer=buf,
+                                        offset=offset + (3 + MAX_PLAYERS) * 8)
+    offset += result_size
+    views['headers'] = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=offset)
+    offset += headers_size
+    views['frames'] = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=buf, offset=offset)
+    return views
+
+# =========================
+# RING FRAME DAN SLOT HASIL
+# =========================
+
+def _write_frame(views, seq, frame):
+    slot = seq % len(views['headers'])
+    views['headers'][slot] = -1  # tandai slot sedang ditulis
+    views['frames'][slot][:] = frame
+    views['headers'][slot] = seq
+    views['control'][CTRL_CAPTURE_SEQ] = seq
+
+# Salin frame dengan nomor urut tertentu dari ring. None jika slot sudah ditimpa frame lain.
+def _read_frame(views, seq):
+    slot = seq % len(views['headers'])
+    if views['headers'][slot] != seq:
+        return None
+    frame = views['frames'][slot].copy()
+    if views['headers'][slot] != seq:  # ditimpa saat sedang disalin
+        return None
+    return frame
+
+# Tulis hasil landmark (satu penulis: proses inferensi). Versi ganjil = sedang ditulis.
+def _write_result(views, frame_seq, points, handedness):
+    meta = views['result_meta']
+    version = meta[0]
+    meta[0] = version + 1
+    num_hands = min(len(points), MAX_PLAYERS)
+    views['result_points'][:num_hands] = points[:num_hands]
+    views['result_handedness'][:num_hands] = handedness[:num_hands]
+    meta[1] = frame_seq
+    meta[2] = num_hands
+    meta[0] = version + 2
+
+# Baca hasil landmark tanpa lock: ulangi kalau versi berubah selama disalin. Mengembalikan None jika
+# slot tetap sedang ditulis sampai timeout (misalnya proses inferensi mati di tengah penulisan).
+def _read_result(views, timeout=RESULT_READ_TIMEOUT):
+    meta = views['result_meta']
+    deadline = time.perf_counter() + timeout
+    attempts = 0
+    while True:
+        attempts += 1
+        if attempts > RESULT_READ_SPINS:
+            if time.perf_counter() > deadline:
+                return None
+            time.sleep(0)  # beri giliran ke proses inferensi
+        version = meta[0]
+        if version % 2 == 1:
+            continue
+        frame_seq = int(meta[1])
+        num_hands = int(meta[2])
+        points = views['result_points'][:num_hands].copy()
+        handedness = views['result_handedness'][:num_hands].copy()
+        if meta[0] == version:
+            return int(version), frame_seq, points, handedness
+
+# =========================
+# PROSES CAPTURE DAN INFERENSI
+# =========================
+
+def _capture_process(shm_name, source, width, height, slots, pace_fps, stage_delays):
+    shm = shared_memory.SharedMemory(name=shm_name)  # proses anak memakai resource tracker milik induk
+    views = _make_views(shm.buf, width, height, slots)
+    control = views['control']
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            control[CTRL_CAPTURE_STATE] = -1
+            return
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        control[CTRL_CAPTURE_STATE] = 1
+
+        seq = 0
+        next_time = time.perf_counter()
+        while not control[CTRL_STOP]:
+            # mode backpressure: jangan menimpa frame yang belum dibaca render
+            if control[CTRL_BACKPRESSURE] and seq + 1 - control[CTRL_RENDER_SEQ] >= slots - 1:
+                time.sleep(0.0005)
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                control[CTRL_CAPTURE_STATE] = 2
+                break
+            inject_stage_delay(stage_delays, 'capture')
+
+            frame = cv2.flip(frame, 1)  # cermin horizontal agar nyaman dilihat
+            if frame.shape[0] != height or frame.shape[1] != width:
+                frame = cv2.resize(frame, (width, height))
+            seq += 1
+            _write_frame(views, seq, frame)
+
+            if pace_fps:
+                next_time += 1.0 / pace_fps
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+    finally:
+        cap.release()
+        control = None  # view numpy harus dilepas sebelum shared memory ditutup
+        views.clear()
+        shm.close()
+
+def _inference_process(shm_name, width, height, slots, stage_delays):
+    shm = shared_memory.SharedMemory(name=shm_name)  # proses anak memakai resource tracker milik induk
+    views = _make_views(shm.buf, width, height, slots)
+    control = views['control']
+    detector = None
+    detector_config = None
+    last_seq = 0
+    try:
+        while not control[CTRL_STOP]:
+            # buat ulang detektor kalau jumlah tangan atau kompleksitas model berubah
+            config = (int(control[CTRL_MAX_HANDS]), int(control[CTRL_MODEL_COMPLEXITY]))
+            if config != detector_config:
+                if detector is not None:
+                    detector.close()
+                detector = create_hands_detector(*config)
+                detector_config = config
+                control[CTRL_INFERENCE_STATE] = 1
+
+            # selalu ambil frame terbaru; frame lama dilewati kalau inferensi tertinggal
+            seq = int(control[CTRL_CAPTURE_SEQ])
+            if seq <= last_seq + control[CTRL_INFERENCE_SKIP]:
+                time.sleep(0.0005)
+                continue
+            frame = _read_frame(views, seq)
+            if frame is None:
+                continue
+
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            scale = control[CTRL_INFERENCE_SCALE] / 100.0
+            if scale < 1.0:
+                rgb_frame = cv2.resize(rgb_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            hand_results = detector.process(rgb_frame)
+            inject_stage_delay(stage_delays, 'inference')
+
+            points = np.empty((0, 21, 3))
+            handedness = []
+            if hand_results.multi_hand_landmarks:
+                points = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                                   for hand in hand_results.multi_hand_landmarks])
+                for i in range(len(points)):
+                    label = ""
+                    if hand_results.multi_handedness and i < len(hand_results.multi_handedness):
+                        label = hand_results.multi_handedness[i].classification[0].label
+                    handedness.append(HANDEDNESS_CODES.get(label, -1))
+            _write_result(views, seq, points, handedness)
+            control[CTRL_INFERENCE_COUNT] += 1
+            last_seq = seq
+    finally:
+        if detector is not None:
+            detector.close()
+        control = None
+        views.clear()
+        shm.close()
+
+# =========================
+# API UNTUK PROSES RENDER (GAME)
+# =========================
+
+# Mulai proses capture dan inferensi. Mengembalikan dict pipeline, atau None jika kamera gagal dibuka.
+def start_pipeline(source, width, height, max_hands=1, slots=PIPELINE_SLOTS, backpressure=False,
+                   pace_fps=0, stage_delays=None, classify=None):
+    total_size = sum(_layout_sizes(width, height, slots))
+    shm = shared_memory.SharedMemory(create=True, size=total_size)
+    views = _make_views(shm.buf, width, height, slots)
+    views['control'][:] = 0
+    views['result_meta'][:] = 0
+    views['headers'][:] = 0
+    views['control'][CTRL_MAX_HANDS] = max_hands
+    views['control'][CTRL_MODEL_COMPLEXITY] = 1
+    views['control'][CTRL_INFERENCE_SCALE] = 100
+    views['control'][CTRL_BACKPRESSURE] = int(backpressure)
+
+    ctx = mproc.get_context("spawn")  # proses anak bersih, tidak mewarisi jendela/kamera/audio
+    stage_delays = stage_delays or {}
+    processes = [
+        ctx.Process(target=_capture_process, name="capture", daemon=True,
+                    args=(shm.name, source, width, height, slots, pace_fps, stage_delays)),
+        ctx.Process(target=_inference_process, name="inference", daemon=True,
+                    args=(shm.name, width, height, slots, stage_delays)),
+    ]
+    pipeline = {
+        'shm': shm,
+        'views': views,
+        'processes': processes,
+        'width': width,
+        'height': height,
+        'last_seq': 0,
+        'result_version': -1,
+        'hands': [],
+        'result_seq': 0,
+        # fungsi klasifikasi gesture milik proses render; main.py mengirim fungsinya sendiri supaya
+        # profil threshold dan registry template yang dimuat di sana ikut terpakai
+        'classify': classify or detect_gestures_batch
+    }
+    for process in processes:
+        process.start()
+
+    # tunggu sampai kamera terbuka dan detektor siap
+    control = views['control']
+    deadline = time.time() + PIPELINE_START_TIMEOUT
+    while time.time() < deadline:
+        if control[CTRL_CAPTURE_STATE] == -1:
+            break
+        if control[CTRL_CAPTURE_STATE] != 0 and control[CTRL_INFERENCE_STATE] == 1:
+            return pipeline
+        if not all(process.is_alive() for process in processes) and control[CTRL_CAPTURE_STATE] != 2:
+            break
+        time.sleep(0.01)
+
+    stop_pipeline(pipeline)
+    return None
+
+# Ubah pengaturan inferensi (dipakai quality governor dan pergantian jumlah pemain)
+def configure_pipeline(pipeline, max_hands, quality):
+    control = pipeline['views']['control']
+    control[CTRL_MAX_HANDS] = max_hands
+    control[CTRL_MODEL_COMPLEXITY] = quality['model_complexity']
+    control[CTRL_INFERENCE_SCALE] = int(round(quality['inference_scale'] * 100))
+    control[CTRL_INFERENCE_SKIP] = quality['inference_skip']
+
+# Nama proses anak yang berhenti padahal pipeline belum dihentikan, None jika semua masih jalan.
+# Proses capture boleh selesai sendiri saat video habis.
+def _dead_process(pipeline):
+    control = pipeline['views']['control']
+    for process in pipeline['processes']:
+        if process.is_alive():
+            continue
+        if process.name == "capture" and control[CTRL_CAPTURE_STATE] == 2:
+            continue
+        return process.name
+    return None
+
+# Ambil frame berikutnya dari ring. Dengan backpressure semua frame dibaca berurutan, tanpa backpressure
+# selalu frame terbaru. Mengembalikan None jika video habis, kamera gagal, proses anak mati, atau timeout.
+def read_frame(pipeline, timeout=2.0):
+    views = pipeline['views']
+    control = views['control']
+    deadline = time.perf_counter() + timeout
+    dead = _dead_process(pipeline)
+    if dead:
+        print(f"Proses {dead} pipeline berhenti tiba-tiba.")
+        return None
+    while time.perf_counter() < deadline:
+        latest = int(control[CTRL_CAPTURE_SEQ])
+        if latest > pipeline['last_seq']:
+            seq = pipeline['last_seq'] + 1 if control[CTRL_BACKPRESSURE] else latest
+            frame = _read_frame(views, seq)
+            if frame is not None:
+                pipeline['last_seq'] = seq
+                control[CTRL_RENDER_SEQ] = seq
+                return frame
+            continue
+        if control[CTRL_CAPTURE_STATE] in (-1, 2):
+            return None
+        if not pipeline['processes'][0].is_alive():
+            print("Proses capture pipeline berhenti tiba-tiba.")
+            return None
+        time.sleep(0.0005)
+    return None
+
+# Ubah hasil landmark terakhir menjadi daftar tangan seperti collect_hands() di main.py.
+# Gesture semua tangan diklasifikasi dalam satu panggilan, hanya saat ada hasil baru.
+# Mengembalikan None jika proses inferensi sudah mati (landmark tidak akan diperbarui lagi).
+def read_hands(pipeline, width, height):
+    if not pipeline['processes'][1].is_alive():
+        print("Proses inference pipeline berhenti tiba-tiba.")
+        return None
+    result = _read_result(pipeline['views'])
+    if result is None:
+        return pipeline['hands']  # slot hasil sedang ditulis terlalu lama, pakai hasil sebelumnya
+    version, frame_seq, points, handedness = result
+    if version == pipeline['result_version']:
+        return pipeline['hands']
+
+    gestures = pipeline['classify'](points)
+    hands = []
+    for i in range(len(points)):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in points[i]:
+            landmark_list.landmark.add(x=x, y=y, z=z)
+        hands.append({
+            'landmarks': landmark_list,
+            'x': int(points[i][0][0] * width),
+            'y': int(points[i][0][1] * height),
+            'handedness': HANDEDNESS_LABELS.get(int(handedness[i]), ""),
+            'gesture': gestures[i]
+        })
+    pipeline['result_version'] = version
+    pipeline['result_seq'] = frame_seq
+    pipeline['hands'] = hands
+    return hands
+
+# Hentikan semua proses lalu tutup dan hapus shared memory
+def stop_pipeline(pipeline):
+    pipeline['views']['control'][CTRL_STOP] = 1
+    for process in pipeline['processes']:
+        if process.pid is None:
+            continue
+        process.join(PIPELINE_STOP_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    pipeline['views'].clear()
+    pipeline['shm'].close()
+    pipeline['shm'].unlink()
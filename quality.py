@@ -0,0 +1,220 @@
+import argparse  # library untuk membaca argumen command line
+import os  # library untuk membaca environment variable
+import time  # library untuk waktu dan delay
+from collections import deque  # antrian dengan panjang maksimal untuk jendela waktu frame
+
+import numpy as np  # library untuk operasi matematika dan array
+
+# =========================
+# TINGKAT KUALITAS (TIER)
+# =========================
+
+# Daftar tingkat kualitas, dari paling bagus (0) sampai paling ringan. Governor turun satu tingkat
+# saat frame terlalu lambat dan naik lagi saat ada sisa waktu.
+#   model_complexity : kompleksitas model MediaPipe Hands (1 = akurat, 0 = cepat)
+#   inference_scale  : skala resolusi frame yang dikirim ke MediaPipe
+#   inference_skip   : jumlah frame yang dilewati di antara dua inferensi (hasil lama dipakai ulang)
+#   effects          : efek denyut dan overlay transparan di zona deteksi dan info game
+#   draw_landmarks   : gambar kerangka landmark tangan
+QUALITY_TIERS = [
+    {'name': "penuh", 'model_complexity': 1, 'inference_scale': 1.0, 'inference_skip': 0, 'effects': True, 'draw_landmarks': True},
+    {'name': "tanpa efek", 'model_complexity': 1, 'inference_scale': 1.0, 'inference_skip': 0, 'effects': False, 'draw_landmarks': True},
+    {'name': "model ringan", 'model_complexity': 0, 'inference_scale': 1.0, 'inference_skip': 0, 'effects': False, 'draw_landmarks': True},
+    {'name': "resolusi 75%", 'model_complexity': 0, 'inference_scale': 0.75, 'inference_skip': 0, 'effects': False, 'draw_landmarks': True},
+    {'name': "resolusi 50%", 'model_complexity': 0, 'inference_scale': 0.5, 'inference_skip': 0, 'effects': False, 'draw_landmarks': True},
+    {'name': "lewati 1 frame", 'model_complexity': 0, 'inference_scale': 0.5, 'inference_skip': 1, 'effects': False, 'draw_landmarks': True},
+    {'name': "tanpa landmark", 'model_complexity': 0, 'inference_scale': 0.5, 'inference_skip': 1, 'effects': False, 'draw_landmarks': False},
+]
+
+TARGET_FPS = 30  # FPS yang ingin dipertahankan
+QUALITY_WINDOW_FRAMES = 45  # jumlah frame terakhir yang dipakai menghitung persentil
+QUALITY_PERCENTILE = 90  # persentil waktu frame yang dibandingkan dengan batas waktu
+QUALITY_DEGRADE_RATIO = 1.10  # turun tingkat jika persentil > 110% batas waktu frame
+QUALITY_UPGRADE_RATIO = 0.70  # naik tingkat jika persentil < 70% batas waktu frame
+QUALITY_UPGRADE_HOLD = 90  # jumlah frame stabil sebelum boleh naik tingkat
+QUALITY_MAX_UPGRADE_HOLD = 720  # batas atas hold setelah beberapa kali naik-turun
+WAIT_KEY_MS = 10  # jeda cv2.waitKey() tiap frame di main loop, bukan bagian dari kerja frame
+
+# =========================
+# QUALITY GOVERNOR
+# =========================
+
+# Buat state governor dalam bentuk dict. Governor hanya menerima waktu kerja frame (decode, inferensi,
+# render), tanpa waktu menunggu kamera dan cv2.waitKey(). Batas waktu kerja = interval frame dikurangi
+# jeda waitKey. Kalau kamera lebih lambat dari target (source_fps), interval kamera yang dipakai, karena
+# FPS tidak bisa lebih tinggi dari kamera walaupun kualitas diturunkan.
+def create_quality_governor(target_fps=TARGET_FPS, start_tier=0, log=print, source_fps=None,
+                            wait_ms=WAIT_KEY_MS):
+    fps = min(target_fps, source_fps) if source_fps and source_fps > 0 else target_fps
+    return {
+        'budget_ms': 1000.0 / fps - wait_ms,
+        'tier': start_tier,
+        'frame_times': deque(maxlen=QUALITY_WINDOW_FRAMES),
+        'cycle_times': [],  # waktu frame dalam satu siklus inferensi (inference_skip + 1 frame)
+        'frames_since_change': 0,
+        'upgrade_hold': QUALITY_UPGRADE_HOLD,
+        'last_change': None,  # 'turun' atau 'naik'
+        'history': [],  # catatan perubahan tingkat: (frame, tier_lama, tier_baru, persentil_ms)
+        'frame_index': 0,
+        'log': log
+    }
+
+# Pengaturan kualitas untuk tingkat yang sedang aktif
+def current_quality(governor):
+    return QUALITY_TIERS[governor['tier']]
+
+def _change_tier(governor, new_tier, percentile_ms, direction):
+    old_tier = governor['tier']
+    governor['tier'] = new_tier
+    governor['history'].append((governor['frame_index'], old_tier, new_tier, percentile_ms))
+
+    # kalau baru saja naik lalu langsung turun lagi, tunggu lebih lama sebelum mencoba naik lagi
+    if (direction == 'turun' and governor['last_change'] == 'naik' and
+            governor['frames_since_change'] < governor['upgrade_hold']):
+        governor['upgrade_hold'] = min(governor['upgrade_hold'] * 2, QUALITY_MAX_UPGRADE_HOLD)
+    governor['last_change'] = direction
+    governor['frames_since_change'] = 0
+    governor['frame_times'].clear()  # mulai hitung ulang dengan pengaturan baru
+    governor['cycle_times'] = []
+
+    if governor['log']:
+        governor['log'](f"[Kualitas] frame {governor['frame_index']}: tingkat {old_tier} -> {new_tier} "
+                        f"({QUALITY_TIERS[new_tier]['name']}), p{QUALITY_PERCENTILE}={percentile_ms:.1f} ms, "
+                        f"batas={governor['budget_ms']:.1f} ms")
+
+# Masukkan waktu kerja satu frame (ms). Mengembalikan True jika tingkat kualitas berubah.
+# Saat inferensi dilewati, waktu frame dirata-rata per siklus inferensi (satu frame inferensi + frame
+# yang dilewati). Tanpa ini persentil tetap jatuh di frame inferensi dan tingkat "lewati frame" tidak
+# pernah terlihat lebih ringan.
+def update_quality_governor(governor, frame_ms):
+    governor['frame_index'] += 1
+    governor['frames_since_change'] += 1
+    governor['cycle_times'].append(frame_ms)
+    if len(governor['cycle_times']) < current_quality(governor)['inference_skip'] + 1:
+        return False
+    governor['frame_times'].append(sum(governor['cycle_times']) / len(governor['cycle_times']))
+    governor['cycle_times'] = []
+
+    # tunggu sampai jendela penuh supaya keputusan tidak berdasarkan beberapa frame saja
+    if len(governor['frame_times']) < QUALITY_WINDOW_FRAMES:
+        return False
+
+    percentile_ms = float(np.percentile(governor['frame_times'], QUALITY_PERCENTILE))
+    budget_ms = governor['budget_ms']
+
+    if percentile_ms > budget_ms * QUALITY_DEGRADE_RATIO and governor['tier'] < len(QUALITY_TIERS) - 1:
+        _change_tier(governor, governor['tier'] + 1, percentile_ms, 'turun')
+        return True
+
+    if (percentile_ms < budget_ms * QUALITY_UPGRADE_RATIO and governor['tier'] > 0 and
+            governor['frames_since_change'] >= governor['upgrade_hold']):
+        _change_tier(governor, governor['tier'] - 1, percentile_ms, 'naik')
+        return True
+
+    return False
+
+# =========================
+# DELAY BUATAN UNTUK PENGUJIAN
+# =========================
+
+# Baca delay buatan per tahap dari environment, contoh: QUALITY_STAGE_DELAYS="inference=20,render=5"
+def parse_stage_delays(text=None):
+    if text is None:
+        text = os.environ.get("QUALITY_STAGE_DELAYS", "")
+    delays = {}
+    for item in text.split(","):
+        if "=" not in item:
+            continue
+        stage, value = item.split("=", 1)
+        try:
+            delays[stage.strip()] = float(value)
+        except ValueError:
+            print(f"Delay tahap tidak valid: {item}")
+    return delays
+
+# Tidur sebentar untuk mensimulasikan tahap yang lambat (capture, inference, render)
+def inject_stage_delay(delays, stage):
+    delay_ms = delays.get(stage, 0)
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000.0)
+
+# =========================
+# SIMULASI TANPA KAMERA (HEADLESS)
+# =========================
+
+# Perkiraan biaya tiap tahap (ms) untuk pengaturan kualitas tertentu
+def simulated_stage_costs(quality, base_costs, extra_delays):
+    inference = base_costs['inference'] * (1.0 if quality['model_complexity'] == 1 else 0.5)
+    inference *= quality['inference_scale'] ** 2
+    render = base_costs['render'] + (base_costs['effects'] if quality['effects'] else 0)
+    render += base_costs['landmarks'] if quality['draw_landmarks'] else 0
+    return {
+        'capture': base_costs['capture'] + extra_delays.get('capture', 0),
+        'inference': inference + extra_delays.get('inference', 0),
+        'render': render + extra_delays.get('render', 0)
+    }
+
+# Jalankan governor dengan waktu frame buatan. `load_schedule` berisi (frame_mulai, delay_per_tahap):
+# delay tambahan aktif mulai frame tersebut. Loop meniru main(): tunggu frame kamera (camera_fps),
+# kerjakan frame, lalu jeda waitKey. Governor hanya menerima waktu kerja, sedangkan FPS yang tercapai
+# dihitung dari waktu loop lengkap. Jika realtime=True, semua tahap dan jeda dijalankan dengan sleep.
+def simulate_quality_governor(load_schedule, frames=1200, target_fps=TARGET_FPS, realtime=False, log=print,
+                              camera_fps=TARGET_FPS, wait_ms=WAIT_KEY_MS):
+    base_costs = {'capture': 2.0, 'inference': 10.0, 'render': 2.0, 'effects': 1.5, 'landmarks': 1.0}
+    governor = create_quality_governor(target_fps, log=log, source_fps=camera_fps, wait_ms=wait_ms)
+    schedule = sorted(load_schedule, key=lambda item: item[0])
+    extra_delays = {}
+    camera_interval_ms = 1000.0 / camera_fps
+    tiers = []
+    loop_times = []
+    clock_ms = 0.0  # waktu simulasi, frame kamera ke-n tersedia pada n * camera_interval_ms
+
+    for frame_index in range(frames):
+        while schedule and schedule[0][0] <= frame_index:
+            extra_delays = schedule.pop(0)[1]
+
+        quality = current_quality(governor)
+        costs = simulated_stage_costs(quality, base_costs, extra_delays)
+        # inferensi hanya dijalankan sekali tiap (skip + 1) frame
+        if frame_index % (quality['inference_skip'] + 1) != 0:
+            costs['inference'] = 0.0
+
+        # tunggu frame kamera berikutnya (seperti cap.read() yang memblokir), tidak dihitung ke governor
+        loop_start_ms = clock_ms
+        camera_wait_ms = max(0.0, np.ceil(clock_ms / camera_interval_ms - 1e-9) * camera_interval_ms - clock_ms)
+        if realtime:
+            time.sleep(camera_wait_ms / 1000.0)
+            start = time.perf_counter()
+            for stage in ('capture', 'inference', 'render'):
+                inject_stage_delay(costs, stage)
+            frame_ms = (time.perf_counter() - start) * 1000
+            time.sleep(wait_ms / 1000.0)
+        else:
+            frame_ms = sum(costs.values())
+        clock_ms += camera_wait_ms + frame_ms + wait_ms
+
+        update_quality_governor(governor, frame_ms)
+        tiers.append(governor['tier'])
+        loop_times.append(clock_ms - loop_start_ms)
+
+    return governor, tiers, loop_times
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulasi quality governor tanpa kamera")
+    parser.add_argument("--frames", type=int, default=1200, help="jumlah frame simulasi")
+    parser.add_argument("--fps", type=float, default=TARGET_FPS, help="target FPS")
+    parser.add_argument("--delays", default="inference=25,render=4",
+                        help="delay buatan per tahap saat beban tinggi, contoh inference=25,render=4")
+    parser.add_argument("--camera-fps", type=float, default=TARGET_FPS, help="FPS kamera yang disimulasikan")
+    parser.add_argument("--realtime", action="store_true", help="jalankan delay dengan sleep sungguhan")
+    args = parser.parse_args()
+
+    # beban normal -> beban tinggi di sepertiga awal -> normal lagi di dua pertiga akhir
+    schedule = [(0, {}), (args.frames // 3, parse_stage_delays(args.delays)), (2 * args.frames // 3, {})]
+    governor, tiers, loop_times = simulate_quality_governor(schedule, args.frames, args.fps, args.realtime,
+                                                            camera_fps=args.camera_fps)
+    for name, start, end in (("normal", 0, args.frames // 3), ("beban tinggi", args.frames // 3, 2 * args.frames // 3),
+                             ("normal lagi", 2 * args.frames // 3, args.frames)):
+        print(f"{name:<13} FPS rata-rata {1000.0 / np.mean(loop_times[start:end]):5.1f}, tingkat akhir {tiers[end - 1]}")
+    print(f"Tingkat akhir: {governor['tier']} ({current_quality(governor)['name']}), "
+          f"perubahan tingkat: {len(governor['history'])}")